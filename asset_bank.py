@@ -0,0 +1,135 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+import asset_cache
+
+COUNTDOWN_DIR = "countdown_images"
+COUNTDOWN_FRAMES = 31    # 0.tif to 30.tif
+ATLAS_MAX_WIDTH = 2048
+
+# ---------------------------------------------------------
+# Countdown Asset Bank
+# ---------------------------------------------------------
+class AssetBank:
+    """
+    The countdown images (frames 0-30, alert-on.tif and background.tif),
+    loaded once on a thread pool through the raw pixel asset cache. After
+    finalize() the frames are packed into one display-format atlas and the
+    other images are converted too, so blits in the countdown loop need no
+    pixel-format conversion.
+
+    Decoding may run before the window exists (start_loading); finalize()
+    needs the display mode to be set.
+    """
+    def __init__(self, directory=COUNTDOWN_DIR, frames=COUNTDOWN_FRAMES, max_workers=4):
+        self.directory = directory
+        self.frame_count = frames
+        self.max_workers = max_workers
+        self._futures = None
+        self._started = None
+        self.atlas = None
+        self.frame_rects = {}    # number -> rect of that frame in the atlas
+        self.background = None
+        self.alert = None
+        self.load_seconds = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.tif")
+
+    def start_loading(self):
+        """
+        Starts decoding every image in the background. Returns at once;
+        calling it again does nothing.
+        """
+        if self._futures is not None:
+            return self
+        self._started = pygame.time.get_ticks()
+        names = [str(i) for i in range(self.frame_count)] + ["alert-on", "background"]
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asset-bank")
+        self._futures = {name: executor.submit(self._decode, name) for name in names}
+        executor.shutdown(wait=False)
+        return self
+
+    def _decode(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            print(f"Warning: {path} not found")
+            return None
+        return asset_cache.load_image(path)
+
+    def done(self):
+        """
+        True once every image has been decoded.
+        """
+        return self._futures is not None and all(f.done() for f in self._futures.values())
+
+    def finalize(self):
+        """
+        Waits for the decode to finish, converts everything to the display
+        format and builds the frame atlas. Safe to call more than once.
+        """
+        if self.atlas is not None:
+            return self
+        self.start_loading()
+        images = {name: future.result() for name, future in self._futures.items()}
+        self.background = images.pop("background")
+        if self.background is not None:
+            self.background = self.background.convert()
+        self.alert = images.pop("alert-on")
+        if self.alert is not None:
+            self.alert = self.alert.convert_alpha()
+        frames = {int(name): image for name, image in images.items() if image is not None}
+        self.atlas, self.frame_rects = self._pack(frames)
+        self.load_seconds = (pygame.time.get_ticks() - self._started) / 1000
+        return self
+
+    @staticmethod
+    def _pack(frames):
+        """
+        Packs the frames left to right in rows no wider than
+        ATLAS_MAX_WIDTH. Returns (atlas surface, {number: rect}).
+        """
+        rects = {}
+        x = y = row_height = width = 0
+        for number in sorted(frames):
+            w, h = frames[number].get_size()
+            if x and x + w > ATLAS_MAX_WIDTH:
+                x, y, row_height = 0, y + row_height, 0
+            rects[number] = pygame.Rect(x, y, w, h)
+            x += w
+            width = max(width, x)
+            row_height = max(row_height, h)
+        atlas = pygame.Surface((max(width, 1), max(y + row_height, 1)), pygame.SRCALPHA).convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        for number, rect in rects.items():
+            # Copy the pixels (alpha included) rather than blending them.
+            atlas.blit(frames[number], rect, special_flags=pygame.BLEND_RGBA_ADD)
+        return atlas, rects
+
+    def has_frame(self, number):
+        return number in self.frame_rects
+
+    def blit_frame(self, surface, number, position):
+        """
+        Draws countdown frame `number` at position. Returns the rect drawn,
+        or None if there is no such frame.
+        """
+        rect = self.frame_rects.get(number)
+        if rect is None:
+            return None
+        return surface.blit(self.atlas, position, rect)
+
+# One bank shared by the main app and the countdown timer, so the images
+# are decoded once per process.
+_shared_bank = None
+
+def shared_bank():
+    """
+    Returns the process-wide AssetBank (loading starts on first call).
+    """
+    global _shared_bank
+    if _shared_bank is None:
+        _shared_bank = AssetBank().start_loading()
+    return _shared_bank
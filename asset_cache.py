@@ -0,0 +1,111 @@
+import glob
+import hashlib
+import mmap
+import os
+import struct
+
+import pygame
+
+# ---------------------------------------------------------
+# Raw Pixel Asset Cache
+# ---------------------------------------------------------
+# Decoded (and scaled) images are stored as raw pixels so later launches
+# map the file and hand it to pygame without any JPEG/TIFF decoding.
+# Entries are keyed by the SHA-1 of the source file and the target size,
+# so editing a source image makes the next launch rebuild its entry.
+CACHE_DIR = ".cache"
+
+# Cache file header: magic, width, height, pixel format ("RGB" or "RGBA").
+HEADER = struct.Struct("<4sII4s")
+MAGIC = b"PXC1"
+
+def source_hash(path):
+    """
+    Returns the SHA-1 hex digest of a file's contents.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_path(cache_dir, path, digest, size):
+    name = os.path.splitext(os.path.basename(path))[0]
+    size_tag = f"{size[0]}x{size[1]}" if size else "orig"
+    return os.path.join(cache_dir, f"{name}-{size_tag}-{digest[:16]}.px")
+
+def _read_entry(cached):
+    """
+    Maps a cache file and returns a surface backed by it, or None if the
+    file is missing or not a valid entry.
+    """
+    try:
+        with open(cached, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(data) < HEADER.size:
+        data.close()
+        return None
+    magic, width, height, fmt = HEADER.unpack_from(data)
+    fmt = fmt.rstrip(b"\0").decode("ascii", "replace")
+    if magic != MAGIC or fmt not in ("RGB", "RGBA") or len(data) != HEADER.size + width * height * len(fmt):
+        data.close()
+        return None
+    # frombuffer shares the mapped pages instead of copying them; the
+    # surface keeps the mapping alive.
+    return pygame.image.frombuffer(memoryview(data)[HEADER.size:], (width, height), fmt)
+
+def _write_entry(cached, surface):
+    """
+    Writes a surface's pixels to the cache (via a temporary file, so a
+    crash never leaves a half-written entry behind).
+    """
+    fmt = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+    width, height = surface.get_size()
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, width, height, fmt.encode()))
+        f.write(pygame.image.tobytes(surface, fmt))
+    os.replace(tmp, cached)
+
+def load_image(path, size=None, cache_dir=CACHE_DIR):
+    """
+    Returns the image at path, scaled to size if given. Loads it from the
+    raw pixel cache when an entry for the current file contents exists;
+    otherwise decodes the source and (re)builds the entry. Cache problems
+    are reported and fall back to a normal decode.
+    """
+    try:
+        digest = source_hash(path)
+    except OSError:
+        # Let pygame raise its usual error for a missing file.
+        return pygame.image.load(path)
+    cached = _cache_path(cache_dir, path, digest, size)
+    surface = _read_entry(cached)
+    if surface is not None:
+        return surface
+
+    surface = pygame.image.load(path)
+    if size is not None and surface.get_size() != tuple(size):
+        surface = pygame.transform.scale(surface, size)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop entries made from older versions of this source at this size.
+        for stale in glob.glob(_cache_path(cache_dir, path, "*", size)):
+            if stale != cached:
+                os.remove(stale)
+        _write_entry(cached, surface)
+    except (OSError, pygame.error) as e:
+        print(f"Could not cache {path}:", e)
+    return surface
+
+def clear(cache_dir=CACHE_DIR):
+    """
+    Deletes every cache entry. Returns the number removed.
+    """
+    removed = 0
+    for entry in glob.glob(os.path.join(cache_dir, "*.px")):
+        os.remove(entry)
+        removed += 1
+    return removed
@@ -0,0 +1,469 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pygame
+import psycopg2
+from psycopg2 import extras
+
+import database
+import main as app
+from player_cache import CodenameCache
+from udp_server import UDPReceiver, count_only
+
+# ---------------------------------------------------------
+# Settings
+# ---------------------------------------------------------
+BASELINE_PATH = "benchmark_baseline.json"
+RESULTS_PATH = "benchmark_results.json"
+# A result more than this fraction worse than the baseline is a regression.
+# Runs on a shared machine differ by up to about 30%, so only clear
+# slowdowns are flagged. Record the baseline on the machine that runs
+# the comparison (--save-baseline).
+DEFAULT_TOLERANCE = 0.5
+
+ROSTER_SIZES = (15, 100, 1000)      # players per team
+QUICK_ROSTER_SIZES = (15, 1000)
+FRAMES = 200
+UDP_MESSAGES = 20000
+UDP_BATCH = 1000                    # datagrams per burst; fits in the receive buffer
+DB_PLAYERS = 10000
+DB_OPERATIONS = 1000
+# Each measurement is repeated and the best round kept, so a burst of
+# noise from the rest of the machine does not count as a regression.
+ROUNDS = 5
+
+# IDs of the benchmark's players (only ever written to the in-memory
+# roster and to a temporary table).
+BENCH_ID_BASE = 900000000
+CODENAMES = ("Ace", "Blaze", "Comet", "Dash", "Echo", "Falcon", "Ghost", "Hawk", "Ivy", "Jet")
+
+SUITES = ("frames", "udp", "db")
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+def result(value, unit, better="lower"):
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+def best_of(rounds, measure, better="lower"):
+    """
+    Calls measure() `rounds` times and returns the best value.
+    """
+    values = [measure() for _ in range(rounds)]
+    return min(values) if better == "lower" else max(values)
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Hides what the code under test prints (per-message logging, stats).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# ---------------------------------------------------------
+# Frame Time
+# ---------------------------------------------------------
+def _key(key, unicode=""):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0))
+
+def _time_frames(frames, before_frame):
+    """
+    Returns the median time in ms of main.step(wait=False), calling
+    before_frame(i) (to post input) ahead of each frame.
+    """
+    times = []
+    for i in range(frames):
+        before_frame(i)
+        start = time.perf_counter()
+        app.step(wait=False)
+        times.append(time.perf_counter() - start)
+    return median(times) * 1000
+
+def _fill_roster(players_per_team, rng):
+    app.ROSTER.clear()
+    for i in range(players_per_team * 2):
+        app.ROSTER.add(BENCH_ID_BASE + i, f"{rng.choice(CODENAMES)}{i + 1}", 1000 + i, ("green", "red")[i % 2])
+
+def _close_popup():
+    app.popup_info_text = ""
+    app.popup_mode = None
+    app.state = "main"
+    app.set_main_focus(0)
+
+def bench_frames(sizes, frames=FRAMES, rounds=ROUNDS):
+    """
+    Frame time of the main screen (full redraw and scrolling the team
+    tables) and of the add-player and update-player popups while typing,
+    at each roster size, on a headless display.
+    """
+    results = {}
+    rng = random.Random(1)
+    with quiet():
+        app.init_app(headless=True, show_splash=False)
+    try:
+        for size in sizes:
+            with quiet():
+                _fill_roster(size, rng)
+                app.step(wait=False)
+
+                def full_redraw(i):
+                    app.last_scene = None
+                results[f"frame.main.full_redraw.{size}"] = result(
+                    best_of(rounds, lambda: _time_frames(frames, full_redraw)), "ms")
+
+                def scroll(i):
+                    _key(pygame.K_HOME if i % 20 == 0 else pygame.K_PAGEDOWN)
+                results[f"frame.main.scroll.{size}"] = result(
+                    best_of(rounds, lambda: _time_frames(frames, scroll)), "ms")
+
+                def typing(i):
+                    if i % 2:
+                        _key(pygame.K_BACKSPACE)
+                    else:
+                        _key(pygame.K_1, "1")
+                app.start_add_player()
+                results[f"frame.popup_add.{size}"] = result(
+                    best_of(rounds, lambda: _time_frames(frames, typing)), "ms")
+                _close_popup()
+                app.start_update_player()
+                results[f"frame.popup_update.{size}"] = result(
+                    best_of(rounds, lambda: _time_frames(frames, typing)), "ms")
+                _close_popup()
+            print(f"  {size} players/team: " + ", ".join(
+                f"{name[6:-len(str(size)) - 1]} {entry['value']:.3f} ms"
+                for name, entry in results.items() if name.endswith(f".{size}")))
+    finally:
+        with quiet():
+            app.clear_players()
+            app.shutdown()
+    return results
+
+# ---------------------------------------------------------
+# UDP Throughput
+# ---------------------------------------------------------
+def _drain(receiver, expected, timeout=5.0):
+    """
+    Polls until `expected` more datagrams have been handled. Returns the
+    number handled.
+    """
+    target = receiver.packets + expected
+    deadline = time.perf_counter() + timeout
+    while receiver.packets < target and time.perf_counter() < deadline:
+        receiver.poll(0.1)
+    return expected - max(target - receiver.packets, 0)
+
+def _send_rate(receiver, port, messages, payloads):
+    elapsed = 0.0
+    sent = 0
+    while sent < messages:
+        with quiet():
+            start = time.perf_counter()
+            for payload in payloads:
+                app.send_udp_message("127.0.0.1", payload, port)
+            elapsed += time.perf_counter() - start
+        sent += len(payloads)
+        _drain(receiver, len(payloads))
+    return sent / elapsed
+
+def _receive_rate(receiver, sender, messages, payloads):
+    elapsed = 0.0
+    received = 0
+    while received < messages:
+        for payload in payloads:
+            sender.send(payload)
+        start = time.perf_counter()
+        received += _drain(receiver, len(payloads))
+        elapsed += time.perf_counter() - start
+    return received / elapsed
+
+def bench_udp(messages=UDP_MESSAGES, batch=UDP_BATCH, rounds=ROUNDS):
+    """
+    Messages per second sent through main.send_udp_message (it prints
+    each message, which is part of its cost) and handled by the
+    udp_server.py receive loop (UDPReceiver.poll), over loopback. Each is
+    timed on its own: the other side runs untimed between bursts so the
+    two never compete for the CPU.
+    """
+    receiver = UDPReceiver("127.0.0.1", 0, handler=count_only)
+    port = receiver.address[1]
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(("127.0.0.1", port))
+    payloads = [f"{1000 + i % 30}:{1000 + (i * 7) % 30}".encode() for i in range(batch)]
+    per_round = max(messages // rounds, batch)
+    results = {}
+    try:
+        results["udp.send_udp_message"] = result(
+            best_of(rounds, lambda: _send_rate(receiver, port, per_round, payloads), "higher"), "msg/s", "higher")
+        results["udp.server_receive"] = result(
+            best_of(rounds, lambda: _receive_rate(receiver, sender, per_round, payloads), "higher"), "msg/s", "higher")
+    finally:
+        sender.close()
+        receiver.close()
+    print(f"  send_udp_message {results['udp.send_udp_message']['value']:,.0f} msg/s, "
+          f"server receive loop {results['udp.server_receive']['value']:,.0f} msg/s")
+    return results
+
+# ---------------------------------------------------------
+# Database Lookup and Upsert
+# ---------------------------------------------------------
+# The stand-in runs the same queries on SQLite when no PostgreSQL server
+# is reachable (SQLite has no PREPARE and uses ? placeholders).
+SQLITE_CREATE = "CREATE TABLE IF NOT EXISTS players (id INT PRIMARY KEY, codename VARCHAR(30));"
+SQLITE_LOOKUP = "SELECT codename FROM players WHERE id = ?;"
+SQLITE_UPSERT = """
+INSERT INTO players (id, codename) VALUES (?, ?)
+ON CONFLICT (id) DO UPDATE SET codename = excluded.codename
+WHERE players.codename IS NOT excluded.codename;
+"""
+
+# PostgreSQL runs against a TEMP table named players, created for the
+# benchmark's own session. PostgreSQL resolves unqualified table names to
+# the session's temporary schema first, so database.py's own queries
+# (check_player_exists, upsert_player) are measured without reading or
+# writing the real players table, and the table disappears with the
+# connection.
+PG_CREATE_TEMP = "CREATE TEMP TABLE players (id INT PRIMARY KEY, codename VARCHAR(30));"
+PG_RESOLVED_SCHEMA = """
+SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.oid = 'players'::regclass;
+"""
+
+class PostgresBackend:
+    name = "postgresql"
+
+    def __init__(self):
+        self.conn = psycopg2.connect(**database.connection_params, connect_timeout=2)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(PG_CREATE_TEMP)
+            cursor.execute(PG_RESOLVED_SCHEMA)
+            schema = cursor.fetchone()[0]
+            if not schema.startswith("pg_temp"):
+                # A search_path that puts another schema first would send
+                # the benchmark's writes to a real table.
+                raise psycopg2.ProgrammingError(f"players resolves to schema {schema}, not the temporary table")
+            self.conn.commit()
+        except psycopg2.Error:
+            self.conn.close()
+            raise
+        self.cursor = cursor
+
+    def seed(self, rows):
+        extras.execute_values(self.cursor, database.VALUES_UPSERT_QUERY, rows, page_size=1000)
+        self.conn.commit()
+
+    def lookup(self, player_id):
+        return database.check_player_exists(self.cursor, player_id)
+
+    def upsert(self, player_id, codename):
+        database.upsert_player(self.conn, player_id, codename)
+
+    def close(self):
+        self.conn.rollback()
+        self.cursor.execute("DROP TABLE IF EXISTS pg_temp.players;")
+        self.conn.commit()
+        self.cursor.close()
+        self.conn.close()
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.directory.name, "players.db"))
+        self.conn.execute(SQLITE_CREATE)
+        self.conn.commit()
+
+    def seed(self, rows):
+        self.conn.executemany(SQLITE_UPSERT, rows)
+        self.conn.commit()
+
+    def lookup(self, player_id):
+        return self.conn.execute(SQLITE_LOOKUP, (player_id,)).fetchone()
+
+    def upsert(self, player_id, codename):
+        self.conn.execute(SQLITE_UPSERT, (player_id, codename))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+        self.directory.cleanup()
+
+def open_backend():
+    """
+    Connects to the PostgreSQL server from database.py, or falls back to
+    the SQLite stand-in if it cannot be reached.
+    """
+    try:
+        return PostgresBackend()
+    except psycopg2.Error as e:
+        print(f"  PostgreSQL unavailable ({str(e).strip().splitlines()[0]}); using the SQLite stand-in")
+        return SQLiteBackend()
+
+def _median_latency(operation, args):
+    times = []
+    for arg in args:
+        start = time.perf_counter()
+        operation(*arg)
+        times.append(time.perf_counter() - start)
+    return median(times) * 1e6
+
+def bench_db(players=DB_PLAYERS, operations=DB_OPERATIONS, rounds=ROUNDS):
+    """
+    Median latency of a player lookup by ID and of an upsert (with a
+    changed codename, so the row is rewritten) against a table of
+    `players` rows, plus a codename cache hit (the Step 1 fast path).
+    """
+    rng = random.Random(2)
+    backend = open_backend()
+    results = {}
+    try:
+        backend.seed([(BENCH_ID_BASE + i, f"{rng.choice(CODENAMES)}{i}") for i in range(players)])
+        ids = [BENCH_ID_BASE + rng.randrange(players) for _ in range(operations)]
+
+        results[f"db.{backend.name}.lookup"] = result(
+            best_of(rounds, lambda: _median_latency(backend.lookup, [(player_id,) for player_id in ids])), "us")
+        renames = iter(range(10 ** 9))
+        results[f"db.{backend.name}.upsert"] = result(
+            best_of(rounds, lambda: _median_latency(
+                backend.upsert, [(player_id, f"Renamed{next(renames)}") for player_id in ids])), "us")
+    finally:
+        backend.close()
+
+    cache = CodenameCache(maxsize=players)
+    for i in range(players):
+        cache.put(BENCH_ID_BASE + i, f"Player{i}")
+
+    def cache_lookups():
+        start = time.perf_counter()
+        for _ in range(20):
+            for player_id in ids:
+                cache.get(player_id)
+        return (time.perf_counter() - start) / (20 * len(ids)) * 1e6
+    results["db.codename_cache.get"] = result(best_of(rounds, cache_lookups), "us")
+    print("  " + ", ".join(f"{name[3:]} {entry['value']:.2f} us" for name, entry in results.items()))
+    return results
+
+# ---------------------------------------------------------
+# Baseline Comparison
+# ---------------------------------------------------------
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Prints each result next to its baseline. Returns (regressions,
+    skipped): the names of the results more than `tolerance` worse than
+    the baseline, and of those with no baseline entry (not compared).
+    """
+    regressions = []
+    skipped = []
+    for name, entry in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            skipped.append(name)
+            print(f"  {name:36} {entry['value']:>14,.3f} {entry['unit']:6} (no baseline, not compared)")
+            continue
+        change = entry["value"] / base["value"] - 1
+        worse = change > tolerance if entry["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append(name)
+        print(f"  {name:36} {entry['value']:>14,.3f} {entry['unit']:6} baseline {base['value']:>14,.3f} "
+              f"{change:+7.1%}{'  REGRESSION' if worse else ''}")
+    return regressions, skipped
+
+def run(suites=SUITES, quick=False):
+    """
+    Runs the chosen suites and returns the results document.
+    """
+    results = {}
+    rounds = 2 if quick else ROUNDS
+    if "frames" in suites:
+        print("Frame time (headless):")
+        results.update(bench_frames(QUICK_ROSTER_SIZES if quick else ROSTER_SIZES, FRAMES // 4 if quick else FRAMES,
+                                    rounds))
+    if "udp" in suites:
+        print("UDP throughput (loopback):")
+        results.update(bench_udp(UDP_MESSAGES // 4 if quick else UDP_MESSAGES, UDP_BATCH, rounds))
+    if "db" in suites:
+        print("Database:")
+        results.update(bench_db(DB_PLAYERS, DB_OPERATIONS // 4 if quick else DB_OPERATIONS, rounds))
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "cpus": os.cpu_count(),
+        },
+        "quick": quick,
+        "results": results,
+    }
+
+def main():
+    usage = ("Usage: python benchmark.py [--quick] [--only frames,udp,db] [--output file] "
+             "[--baseline file] [--save-baseline] [--tolerance fraction]")
+    options = {"--only": ",".join(SUITES), "--output": RESULTS_PATH, "--baseline": BASELINE_PATH,
+               "--tolerance": str(DEFAULT_TOLERANCE)}
+    flags = {"--quick", "--save-baseline"}
+    argv = sys.argv[1:]
+    chosen = set()
+    i = 0
+    while i < len(argv):
+        if argv[i] in options and i + 1 < len(argv):
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        elif argv[i] in flags:
+            chosen.add(argv[i])
+            i += 1
+        else:
+            print(usage)
+            sys.exit(1)
+    suites = [suite for suite in options["--only"].split(",") if suite]
+    try:
+        tolerance = float(options["--tolerance"])
+        if not suites or any(suite not in SUITES for suite in suites):
+            raise ValueError
+    except ValueError:
+        print(usage)
+        sys.exit(1)
+
+    document = run(suites, "--quick" in chosen)
+    with open(options["--output"], "w") as f:
+        json.dump(document, f, indent=2)
+    print("Results written to", options["--output"])
+
+    if "--save-baseline" in chosen:
+        with open(options["--baseline"], "w") as f:
+            json.dump(document, f, indent=2)
+        print("Baseline saved to", options["--baseline"])
+        return
+    try:
+        with open(options["--baseline"]) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No baseline to compare against ({e}).")
+        return
+    print(f"Compared with {options['--baseline']} (from {baseline.get('created')}, "
+          f"{baseline.get('machine', {}).get('platform')}), tolerance {tolerance:.0%}:")
+    regressions, skipped = compare(document["results"], baseline.get("results", {}), tolerance)
+    if skipped:
+        print(f"{len(skipped)} result(s) skipped, not in the baseline: {', '.join(skipped)}. "
+              f"Record them with --save-baseline.")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
+import csv
+import io
+import sys
+import time
+import weakref
+
 import psycopg2
-from psycopg2 import sql
+from psycopg2 import errors, extras, sql
 
 # -----------------------
 # Connection Parameters
@@ -25,14 +31,238 @@ def create_table_if_not_exists(cursor):
     """
     cursor.execute(create_table_query)
 
+# Player IDs are stored in an INT column.
+PLAYER_ID_MAX = 2**31 - 1
+
+def parse_player_id(text):
+    """Return text as a player ID if it is a plain ASCII number in the INT range, else None."""
+    if not (text.isascii() and text.isdigit()):
+        return None
+    player_id = int(text)
+    return player_id if player_id <= PLAYER_ID_MAX else None
+
 def check_player_exists(cursor, player_id):
     """Check if a player with the given ID exists in the database."""
     cursor.execute("SELECT codename FROM players WHERE id = %s;", (player_id,))
     return cursor.fetchone()  # Returns None if player doesn't exist
 
+# Server-side prepared upsert. Inserts a new player or changes the codename
+# of an existing one in a single statement; unchanged rows are not rewritten.
+PREPARE_UPSERT = """
+PREPARE upsert_player (INT, VARCHAR) AS
+    INSERT INTO players (id, codename) VALUES ($1, $2)
+    ON CONFLICT (id) DO UPDATE SET codename = EXCLUDED.codename
+    WHERE players.codename IS DISTINCT FROM EXCLUDED.codename;
+"""
+EXECUTE_UPSERT = "EXECUTE upsert_player (%s, %s);"
+
+# Connections whose session already has the upsert statement prepared.
+_prepared_connections = weakref.WeakSet()
+
+def upsert_player(conn, player_id, codename):
+    """Insert or update a player in one round trip and commit it."""
+    args = (player_id, codename)
+    cursor = conn.cursor()
+    try:
+        if conn in _prepared_connections:
+            cursor.execute(EXECUTE_UPSERT, args)
+        else:
+            # First use on this connection: prepare and execute in the same round trip.
+            cursor.execute(PREPARE_UPSERT + EXECUTE_UPSERT, args)
+    except (errors.InvalidSqlStatementName, errors.DuplicatePreparedStatement):
+        # The session lost (or already had) the statement; recreate it.
+        conn.rollback()
+        cursor.execute("DEALLOCATE ALL;" + PREPARE_UPSERT + EXECUTE_UPSERT, args)
+    except errors.UndefinedTable:
+        # The table was never created (e.g. the database was down at startup).
+        conn.rollback()
+        create_table_if_not_exists(cursor)
+        cursor.execute("DEALLOCATE ALL;" + PREPARE_UPSERT + EXECUTE_UPSERT, args)
+    conn.commit()
+    cursor.close()
+    _prepared_connections.add(conn)
+
 def insert_player(cursor, player_id, codename):
-    """Insert a new player into the database."""
-    cursor.execute("INSERT INTO players (id, codename) VALUES (%s, %s);", (player_id, codename))
+    """Insert a player (kept for existing callers; now an upsert that commits)."""
+    upsert_player(cursor.connection, player_id, codename)
+
+# -----------------------
+# Bulk Roster Import/Export
+# -----------------------
+DEFAULT_CHUNK_SIZE = 10000
+CODENAME_MAX_LENGTH = 30
+# Only the first few invalid rows are printed; the rest are just counted.
+MAX_REPORTED_ROWS = 10
+
+STAGING_TABLE_QUERY = """
+CREATE TEMP TABLE IF NOT EXISTS players_staging (
+    id INT,
+    codename VARCHAR(30)
+) ON COMMIT DELETE ROWS;
+"""
+MERGE_STAGING_QUERY = """
+INSERT INTO players (id, codename)
+SELECT id, codename FROM players_staging
+ON CONFLICT (id) DO UPDATE SET codename = EXCLUDED.codename
+WHERE players.codename IS DISTINCT FROM EXCLUDED.codename;
+"""
+VALUES_UPSERT_QUERY = """
+INSERT INTO players (id, codename) VALUES %s
+ON CONFLICT (id) DO UPDATE SET codename = EXCLUDED.codename
+WHERE players.codename IS DISTINCT FROM EXCLUDED.codename;
+"""
+
+def read_roster_chunks(csv_file, chunk_size):
+    """Yield (rows, skipped) chunks of valid (id, codename) pairs from a roster CSV."""
+    chunk = {}
+    skipped = 0
+    reported = 0
+    for line_number, row in enumerate(csv.reader(csv_file), start=1):
+        if len(row) < 2:
+            problem = "expected id,codename"
+        else:
+            text, codename = row[0].strip(), row[1].strip()
+            player_id = parse_player_id(text)
+            if player_id is None and line_number == 1 and not (text.isascii() and text.isdigit()):
+                # A non-numeric first line is treated as the header.
+                continue
+            if player_id is None:
+                problem = f"player ID must be a number from 0 to {PLAYER_ID_MAX}"
+            elif not codename or len(codename) > CODENAME_MAX_LENGTH:
+                problem = f"codename must be 1 to {CODENAME_MAX_LENGTH} characters"
+            else:
+                problem = None
+        if problem is not None:
+            skipped += 1
+            reported += 1
+            if reported <= MAX_REPORTED_ROWS:
+                print(f"Skipping line {line_number} ({problem}): {row}")
+            continue
+        # Later rows for the same ID win, as they would with one upsert per row.
+        chunk[player_id] = codename
+        if len(chunk) >= chunk_size:
+            yield list(chunk.items()), skipped
+            chunk = {}
+            skipped = 0
+    if chunk or skipped:
+        yield list(chunk.items()), skipped
+
+def copy_chunk(cursor, rows):
+    """Load one chunk through COPY into the staging table and merge it into players."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.execute(STAGING_TABLE_QUERY)
+    cursor.copy_expert("COPY players_staging (id, codename) FROM STDIN WITH (FORMAT csv);", buffer)
+    cursor.execute(MERGE_STAGING_QUERY)
+
+def values_chunk(cursor, rows):
+    """Upsert one chunk with multi-row INSERT statements (fallback when COPY is unavailable)."""
+    extras.execute_values(cursor, VALUES_UPSERT_QUERY, rows, page_size=1000)
+
+def report_progress(action, rows, started):
+    """Print a running row count and rate."""
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"{action} {rows:,} rows ({rows / elapsed:,.0f} rows/s, {elapsed:.1f}s)")
+
+def import_roster(conn, path, chunk_size=DEFAULT_CHUNK_SIZE, use_copy=True):
+    """Stream a roster CSV (id,codename) into players, one transaction per chunk."""
+    cursor = conn.cursor()
+    create_table_if_not_exists(cursor)
+    conn.commit()
+
+    started = time.perf_counter()
+    imported = 0
+    skipped = 0
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for rows, chunk_skipped in read_roster_chunks(csv_file, chunk_size):
+            skipped += chunk_skipped
+            if not rows:
+                continue
+            if use_copy:
+                try:
+                    copy_chunk(cursor, rows)
+                except (errors.FeatureNotSupported, errors.InsufficientPrivilege) as error:
+                    # COPY is not available on this server or to this user: fall
+                    # back to execute_values for this and all later chunks. Any
+                    # other error (bad data, constraints) is raised as is.
+                    print(f"COPY failed ({error}); falling back to execute_values.")
+                    conn.rollback()
+                    use_copy = False
+            if not use_copy:
+                values_chunk(cursor, rows)
+            conn.commit()
+            imported += len(rows)
+            report_progress("Imported", imported, started)
+
+    cursor.close()
+    if skipped:
+        print(f"Skipped {skipped:,} invalid rows.")
+    report_progress("Finished importing", imported, started)
+    return imported
+
+class _ProgressWriter:
+    """File wrapper that counts exported rows and reports progress as COPY writes."""
+    def __init__(self, csv_file, started, interval=1.0):
+        self.csv_file = csv_file
+        self.started = started
+        self.interval = interval
+        self.rows = -1  # The header line is not a player.
+        self._last_report = started
+
+    def write(self, data):
+        self.rows += data.count("\n")
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            report_progress("Exported", self.rows, self.started)
+        return self.csv_file.write(data)
+
+def export_roster(conn, path):
+    """Stream the players table out to a CSV file with COPY."""
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = _ProgressWriter(csv_file, started)
+        cursor.copy_expert("COPY (SELECT id, codename FROM players ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER);", writer)
+    conn.commit()
+    cursor.close()
+    report_progress("Finished exporting", max(writer.rows, 0), started)
+    return max(writer.rows, 0)
+
+def batch_main(args):
+    """Run a batch command: import <file.csv> [chunk_size] [--no-copy] or export <file.csv>."""
+    use_copy = "--no-copy" not in args
+    args = [arg for arg in args if arg != "--no-copy"]
+    if len(args) < 2 or args[0] not in ("import", "export"):
+        print("Usage: python database.py import <roster.csv> [chunk_size] [--no-copy]")
+        print("       python database.py export <roster.csv>")
+        sys.exit(1)
+
+    chunk_size = DEFAULT_CHUNK_SIZE
+    if len(args) > 2:
+        try:
+            chunk_size = int(args[2])
+        except ValueError:
+            print("Chunk size must be an integer.")
+            sys.exit(1)
+
+    try:
+        conn = psycopg2.connect(**connection_params)
+    except Exception as error:
+        print(f"Error connecting to PostgreSQL database: {error}")
+        sys.exit(1)
+    try:
+        if args[0] == "import":
+            import_roster(conn, args[1], chunk_size, use_copy)
+        else:
+            export_roster(conn, args[1])
+    except (OSError, psycopg2.Error) as error:
+        conn.rollback()
+        print(f"Batch {args[0]} failed: {error}")
+        sys.exit(1)
+    finally:
+        conn.close()
 
 # -----------------------
 # Main Program
@@ -50,11 +280,11 @@ def main():
         # Loop to process two players
         for i in range(2):
             player_id_input = input(f"Enter Player {i+1} ID: ").strip()
-            if not player_id_input.isdigit():
+            player_id = parse_player_id(player_id_input)
+            if player_id is None:
                 print("Player ID must be an integer.")
                 continue
             
-            player_id = int(player_id_input)
             existing_player = check_player_exists(cursor, player_id)
             
             if existing_player:
@@ -64,8 +294,7 @@ def main():
                 if not codename:
                     print("Codename cannot be empty.")
                     continue
-                insert_player(cursor, player_id, codename)
-                conn.commit()
+                upsert_player(conn, player_id, codename)
                 print(f"New player added: {player_id} - {codename}")
         
         # Display all players in the database
@@ -85,4 +314,7 @@ def main():
             conn.close()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:])
+    else:
+        main()
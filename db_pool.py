@@ -0,0 +1,217 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+# ---------------------------------------------------------
+# Connection Pool
+# ---------------------------------------------------------
+# Errors that mean the connection itself is no longer usable and
+# should be thrown away instead of going back into the pool.
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection becomes free before the checkout timeout."""
+
+class ConnectionPool:
+    """
+    A small thread-safe pool of PostgreSQL connections.
+    Connections are opened lazily, kept open between uses and handed
+    back out, so a lookup costs one round trip instead of a new
+    TCP + auth handshake. Idle connections are health checked before
+    reuse and broken ones are replaced with a fresh connection.
+    """
+    def __init__(self, maxconn=4, health_check_interval=30.0, connect_timeout=3, **connect_kwargs):
+        self.maxconn = maxconn
+        self.health_check_interval = health_check_interval
+        self._connect_kwargs = dict(connect_kwargs, connect_timeout=connect_timeout)
+        self._idle = []        # (connection, time it was returned)
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Counters exposed through stats().
+        self._checkouts = 0        # successful checkouts only
+        self._failed_checkouts = 0 # timeouts and failed connects
+        self._reused = 0
+        self._created = 0
+        self._discarded = 0
+        self._failed_health_checks = 0
+        self._connect_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        """
+        Opens a brand new connection. Raises psycopg2.OperationalError
+        if the server cannot be reached.
+        """
+        conn = psycopg2.connect(**self._connect_kwargs)
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for):
+        """
+        Returns True if an idle connection can be reused. Connections that
+        sat idle longer than the health check interval are pinged first.
+        """
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    def getconn(self, timeout=5.0):
+        """
+        Checks a connection out of the pool, opening one if the pool has
+        room and nothing idle is available. Waits up to `timeout` seconds
+        when every connection is in use.
+        """
+        start = time.perf_counter()
+        deadline = start + timeout
+        conn = None
+        with self._cond:
+            while not self._idle and self._in_use >= self.maxconn:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._failed_checkouts += 1
+                    raise PoolTimeout("Timed out waiting for a free database connection.")
+                self._cond.wait(remaining)
+            if self._idle:
+                conn, returned_at = self._idle.pop()
+            # Reserve the slot now so other threads cannot overfill the pool.
+            self._in_use += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, time.monotonic() - returned_at):
+                # Reconnect-on-failure: drop the stale connection and open a new one.
+                with self._cond:
+                    self._failed_health_checks += 1
+                    self._discarded += 1
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+            else:
+                with self._cond:
+                    self._reused += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._failed_checkouts += 1
+                self._connect_failures += 1
+                self._cond.notify()
+            raise
+
+        # Only successful checkouts count towards the wait and hit rate stats.
+        waited = time.perf_counter() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def putconn(self, conn, broken=False):
+        """
+        Returns a connection to the pool. Broken or closed connections are
+        discarded so the next checkout reconnects. Any open transaction is
+        rolled back so the next user starts clean.
+        """
+        if not broken and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except CONNECTION_ERRORS:
+                broken = True
+        with self._cond:
+            self._in_use -= 1
+            if broken or conn.closed or self._closed:
+                broken = True
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if broken:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout=5.0):
+        """
+        Context manager around getconn/putconn. A connection that raises a
+        connection-level error is discarded instead of being reused.
+        """
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken=broken)
+
+    def run(self, func, retries=1, timeout=5.0):
+        """
+        Calls func(conn) with a pooled connection and returns its result.
+        If the connection drops mid-call (server restart, network blip),
+        it is discarded and the call is retried on a fresh connection.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection(timeout) as conn:
+                    return func(conn)
+            except PoolTimeout:
+                raise
+            except CONNECTION_ERRORS:
+                if attempt == retries:
+                    raise
+
+    def stats(self):
+        """
+        Returns a dictionary of pool counters: successful and failed
+        checkouts, reuse hit rate, connections created/discarded and
+        checkout wait times (ms) of the successful checkouts.
+        """
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "checkouts": checkouts,
+                "failed_checkouts": self._failed_checkouts,
+                "reused": self._reused,
+                "hit_rate": self._reused / checkouts if checkouts else 0.0,
+                "created": self._created,
+                "discarded": self._discarded,
+                "failed_health_checks": self._failed_health_checks,
+                "connect_failures": self._connect_failures,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "wait_avg_ms": 1000.0 * self._wait_total / checkouts if checkouts else 0.0,
+                "wait_max_ms": 1000.0 * self._wait_max,
+            }
+
+    def closeall(self):
+        """
+        Closes every idle connection. Connections still checked out are
+        closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
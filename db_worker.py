@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# ---------------------------------------------------------
+# Background Database Worker
+# ---------------------------------------------------------
+# Custom pygame event posted whenever a database job finishes.
+# The event carries `job` (the name given to submit), `job_id`,
+# `future` and any extra keyword arguments passed to submit.
+DB_RESULT = pygame.event.custom_type()
+
+# pygame.event.post fails when the event queue is full; the worker
+# retries a few times before giving up on the result.
+POST_RETRIES = 5
+POST_RETRY_DELAY = 0.05
+
+class DatabaseWorker:
+    """
+    Runs database jobs on a background thread so the pygame loop never
+    waits on SQL. Jobs are plain functions that take a connection; they
+    run through the connection pool and their result (or exception) is
+    delivered back to the main loop as a DB_RESULT event.
+    """
+    def __init__(self, pool, max_workers=1):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._next_id = 0
+
+    def submit(self, job, func, **info):
+        """
+        Queues func(conn) to run on the worker thread and returns
+        (job_id, future). A DB_RESULT event is posted when it finishes.
+        """
+        self._next_id += 1
+        job_id = self._next_id
+        future = self._executor.submit(self.pool.run, func)
+        future.add_done_callback(lambda f: self._post_result(job, job_id, f, info))
+        return job_id, future
+
+    def _post_result(self, job, job_id, future, info):
+        """
+        Posts the finished job to the pygame event queue. pygame.event.post
+        is safe to call from other threads. Returns False (and says so)
+        if the result could not be delivered.
+        """
+        if not pygame.get_init():
+            print(f"Database job '{job}' finished after pygame shut down; result dropped.")
+            return False
+        event = pygame.event.Event(DB_RESULT, job=job, job_id=job_id, future=future, **info)
+        for _ in range(POST_RETRIES):
+            if pygame.event.post(event):
+                return True
+            time.sleep(POST_RETRY_DELAY)
+        print(f"Could not post the result of database job '{job}' (event queue full or blocked).")
+        return False
+
+    def shutdown(self):
+        """
+        Stops accepting jobs and drops any that have not started yet.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,355 @@
+import mmap
+import os
+import socket
+import struct
+import sys
+import time
+from bisect import bisect_right
+
+# ---------------------------------------------------------
+# File Format
+# ---------------------------------------------------------
+# A log file is a 64-byte header, then records back to back, then (once
+# the log is closed) a sparse time index.
+#
+# Header: magic, version, flags, wall clock and monotonic clock at
+# creation (ns), end of the record data, record count, index offset and
+# index entry count. The end and count are updated after every append,
+# so a log cut short by a crash is still readable up to its last record.
+#
+# Record: monotonic timestamp (ns), direction (IN/OUT), peer port, peer
+# IPv4 address, payload length, then the payload itself.
+#
+# Index entry: (timestamp ns, record offset), at most one per
+# INDEX_INTERVAL_NS of log time.
+MAGIC = b"PHOTLOG1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqqQQQQ")
+HEADER_SIZE = 64
+COUNTERS = struct.Struct("<QQ")          # end, count
+COUNTERS_OFFSET = 32
+RECORD = struct.Struct("<qBxH4sH")
+INDEX_ENTRY = struct.Struct("<qQ")
+
+FLAG_CLOSED = 1
+IN = 0
+OUT = 1
+DIRECTIONS = {IN: "in", OUT: "out"}
+
+DEFAULT_CAPACITY = 16 * 1024 * 1024
+INDEX_INTERVAL_NS = 100_000_000          # one index entry per 100 ms
+NO_ADDRESS = b"\0\0\0\0"
+
+# Bound once: append() runs for every datagram.
+_pack_record = RECORD.pack_into
+_pack_counters = COUNTERS.pack_into
+_RECORD_SIZE = RECORD.size
+_monotonic_ns = time.monotonic_ns
+
+# ---------------------------------------------------------
+# Writer
+# ---------------------------------------------------------
+class EventLogWriter:
+    """
+    Appends datagrams to one log file. The file is preallocated and
+    memory-mapped, so an append is a couple of struct.pack_into calls and
+    a slice copy into the mapping: no system call per event. The file
+    grows (doubling) only if the preallocated space runs out. close()
+    writes the time index and trims the file to its used size.
+    """
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, index_interval_ns=INDEX_INTERVAL_NS):
+        self.path = path
+        self.index_interval_ns = index_interval_ns
+        self._file = open(path, "w+b")
+        capacity = max(capacity, HEADER_SIZE + 4096)
+        self._file.truncate(capacity)
+        if hasattr(os, "posix_fallocate"):
+            # Reserve the disk blocks now rather than on first write.
+            try:
+                os.posix_fallocate(self._file.fileno(), 0, capacity)
+            except OSError:
+                pass
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = len(self._map)
+        self.end = HEADER_SIZE
+        self.count = 0
+        self._index = []
+        self._next_index_ns = -1
+        self._peers = {None: (NO_ADDRESS, 0)}   # addr -> (packed IPv4, port)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0, time.time_ns(), time.monotonic_ns(),
+                         self.end, 0, 0, 0)
+
+    def _pack_peer(self, addr):
+        """
+        Packs a peer address once; repeat peers are a dict lookup.
+        """
+        try:
+            peer = (socket.inet_aton(addr[0]), addr[1])
+        except (OSError, TypeError, IndexError):
+            peer = (NO_ADDRESS, 0)
+        if len(self._peers) < 4096:
+            self._peers[addr] = peer
+        return peer
+
+    def _grow(self, needed):
+        size = self._capacity
+        while size < needed:
+            size *= 2
+        self._map.resize(size)
+        self._capacity = size
+
+    def append(self, direction, payload, addr=None, timestamp_ns=None):
+        """
+        Logs one datagram. direction is IN or OUT, payload any bytes-like
+        object (at most 65535 bytes), addr the peer (ip, port) if known.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = _monotonic_ns()
+        size = len(payload)
+        offset = self.end
+        end = offset + _RECORD_SIZE + size
+        if end > self._capacity:
+            self._grow(end)
+        peer = self._peers.get(addr)
+        if peer is None:
+            peer = self._pack_peer(addr)
+        data = self._map
+        _pack_record(data, offset, timestamp_ns, direction, peer[1], peer[0], size)
+        data[offset + _RECORD_SIZE:end] = payload
+        if timestamp_ns >= self._next_index_ns:
+            self._index.append((timestamp_ns, offset))
+            self._next_index_ns = timestamp_ns + self.index_interval_ns
+        self.end = end
+        self.count += 1
+        _pack_counters(data, COUNTERS_OFFSET, end, self.count)
+
+    def flush(self):
+        """
+        Asks the OS to write the mapped pages to disk now (they are
+        written back eventually anyway).
+        """
+        self._map.flush()
+
+    def close(self):
+        """
+        Writes the index, marks the log closed and trims the file.
+        """
+        if self._map is None:
+            return
+        index_offset = self.end
+        final_size = index_offset + INDEX_ENTRY.size * len(self._index)
+        if final_size > self._capacity:
+            self._grow(final_size)
+        for i, entry in enumerate(self._index):
+            INDEX_ENTRY.pack_into(self._map, index_offset + i * INDEX_ENTRY.size, *entry)
+        magic, version, _, wall_ns, mono_ns = HEADER.unpack_from(self._map)[:5]
+        HEADER.pack_into(self._map, 0, magic, version, FLAG_CLOSED, wall_ns, mono_ns,
+                         self.end, self.count, index_offset, len(self._index))
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._file.truncate(final_size)
+        self._file.close()
+
+class EventLog:
+    """
+    Writes one log file per game into a directory. rotate() closes the
+    current file and starts the next one; append() is a no-op until the
+    first rotate(). Used by UDPReceiver and UDPSender (their `log`).
+    """
+    def __init__(self, directory="game_logs", capacity=DEFAULT_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self.writer = None
+        self.files = 0
+        self.append = self._discard
+
+    def rotate(self, label="game"):
+        """
+        Starts a new log file. Returns its path.
+        """
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self.files += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{label}-{stamp}-{os.getpid()}-{self.files}.plog")
+        self.writer = EventLogWriter(path, self.capacity)
+        # append goes straight to the writer, with no extra call per event.
+        self.append = self.writer.append
+        return path
+
+    def _discard(self, direction, payload, addr=None, timestamp_ns=None):
+        """
+        append() while no log file is open: drops the event.
+        """
+
+    def close(self):
+        self.append = self._discard
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+# ---------------------------------------------------------
+# Reader
+# ---------------------------------------------------------
+class LogRecord:
+    """
+    One logged datagram. `payload` is a memoryview into the mapped file,
+    valid until the reader is closed.
+    """
+    __slots__ = ("timestamp_ns", "direction", "addr", "payload")
+
+    def __init__(self, timestamp_ns, direction, addr, payload):
+        self.timestamp_ns = timestamp_ns
+        self.direction = direction
+        self.addr = addr
+        self.payload = payload
+
+    def __repr__(self):
+        return f"LogRecord({self.timestamp_ns}, {DIRECTIONS.get(self.direction)}, {self.addr}, {bytes(self.payload)!r})"
+
+class EventLogReader:
+    """
+    Reads a log file through a read-only mapping. The sparse index
+    (rebuilt by one scan if the log was never closed) lets records()
+    start at any point in the match without reading what comes before.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, flags, self.created_unix_ns, self.created_monotonic_ns,
+         self.end, self.count, index_offset, index_count) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an event log")
+        self.closed_cleanly = bool(flags & FLAG_CLOSED)
+        if self.closed_cleanly:
+            self._index = [INDEX_ENTRY.unpack_from(self._map, index_offset + i * INDEX_ENTRY.size)
+                           for i in range(index_count)]
+        else:
+            self._index = self._scan_index()
+        self._index_times = [ts for ts, _ in self._index]
+
+    def _scan_index(self):
+        index = []
+        next_ns = None
+        for offset, record in self._iter_from(HEADER_SIZE):
+            if next_ns is None or record.timestamp_ns >= next_ns:
+                index.append((record.timestamp_ns, offset))
+                next_ns = record.timestamp_ns + INDEX_INTERVAL_NS
+        return index
+
+    def _iter_from(self, offset):
+        data = self._map
+        view = memoryview(data)
+        end = self.end
+        while offset + RECORD.size <= end:
+            timestamp_ns, direction, port, ip, size = RECORD.unpack_from(data, offset)
+            payload_start = offset + RECORD.size
+            addr = (socket.inet_ntoa(ip), port) if ip != NO_ADDRESS else None
+            yield offset, LogRecord(timestamp_ns, direction, addr, view[payload_start:payload_start + size])
+            offset = payload_start + size
+
+    @property
+    def start_ns(self):
+        return self._index[0][0] if self._index else None
+
+    @property
+    def duration(self):
+        """
+        Seconds from the first record to the last.
+        """
+        if not self._index:
+            return 0.0
+        last = self.start_ns
+        for _, record in self._iter_from(self._index[-1][1]):
+            last = record.timestamp_ns
+        return (last - self.start_ns) / 1e9
+
+    def seek(self, seconds):
+        """
+        Returns the file offset of the index entry at or before `seconds`
+        into the log.
+        """
+        if not self._index:
+            return HEADER_SIZE
+        target = self.start_ns + int(seconds * 1e9)
+        i = bisect_right(self._index_times, target) - 1
+        return self._index[max(i, 0)][1]
+
+    def records(self, start=None, end=None, direction=None):
+        """
+        Yields the LogRecords from `start` to `end` seconds into the log
+        (None means the beginning/end), optionally only one direction.
+        """
+        offset = self.seek(start) if start is not None else HEADER_SIZE
+        start_ns = self.start_ns + int(start * 1e9) if start is not None and self._index else None
+        end_ns = self.start_ns + int(end * 1e9) if end is not None and self._index else None
+        for _, record in self._iter_from(offset):
+            if start_ns is not None and record.timestamp_ns < start_ns:
+                continue
+            if end_ns is not None and record.timestamp_ns > end_ns:
+                return
+            if direction is None or record.direction == direction:
+                yield record
+
+    def __iter__(self):
+        return self.records()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Record payloads are still referenced; the mapping is
+                # released when they are.
+                pass
+            self._file.close()
+            self._map = None
+
+# ---------------------------------------------------------
+# Command Line
+# ---------------------------------------------------------
+def show(path, start=None, end=None):
+    reader = EventLogReader(path)
+    try:
+        for record in reader.records(start, end):
+            seconds = (record.timestamp_ns - reader.start_ns) / 1e9
+            payload = bytes(record.payload)
+            text = payload.decode("ascii") if payload.isascii() and payload.decode("ascii").isprintable() else payload.hex()
+            print(f"{seconds:10.6f} {DIRECTIONS.get(record.direction, '?'):>3} {record.addr} {text}")
+    finally:
+        reader.close()
+
+def summary(path):
+    reader = EventLogReader(path)
+    try:
+        inbound = sum(1 for record in reader.records(direction=IN))
+        duration = reader.duration
+        print(f"{path}: {len(reader):,} records ({inbound:,} in, {len(reader) - inbound:,} out) "
+              f"over {duration:.3f} s, {len(reader._index)} index entries, "
+              f"{'closed' if reader.closed_cleanly else 'not closed (recovered)'}")
+    finally:
+        reader.close()
+
+def main():
+    usage = "Usage: python event_log.py show <file> [start_s] [end_s] | python event_log.py stats <file>"
+    if len(sys.argv) < 3 or sys.argv[1] not in ("show", "stats"):
+        print(usage)
+        sys.exit(1)
+    try:
+        if sys.argv[1] == "show":
+            times = [float(arg) for arg in sys.argv[3:5]] + [None, None]
+            show(sys.argv[2], times[0], times[1])
+        else:
+            summary(sys.argv[2])
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import time
+from collections import deque
+
+import pygame
+
+# ---------------------------------------------------------
+# Adaptive Frame Scheduler
+# ---------------------------------------------------------
+class FrameScheduler:
+    """
+    Paces the main loop. While something is animating (countdown,
+    gameplay, a screen that still has to be drawn) frames run at the
+    full rate. Otherwise the loop sleeps in pygame.event.wait until
+    input, a posted event (database results, network traffic, timers)
+    or the idle timeout wakes it, so an idle console uses almost no CPU.
+
+    It also records how long each frame's work took (event handling and
+    drawing, not the time spent waiting) for the last `history` frames.
+    """
+    def __init__(self, fps=30, idle_timeout_ms=1000, history=1000):
+        self.fps = fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.clock = pygame.time.Clock()
+        self.frames = 0
+        self.idle_waits = 0
+        self.idle_timeouts = 0
+        self.frame_times = deque(maxlen=history)
+        self._frame_start = None
+
+    def get_events(self, animating):
+        """
+        Returns the events for this frame. If nothing is animating,
+        blocks until at least one event arrives or the idle timeout
+        passes (then returns an empty list).
+        """
+        if animating:
+            events = pygame.event.get()
+        else:
+            self.idle_waits += 1
+            event = pygame.event.wait(self.idle_timeout_ms)
+            if event.type == pygame.NOEVENT:
+                self.idle_timeouts += 1
+                return []
+            events = [event]
+            events.extend(pygame.event.get())
+        self._frame_start = time.perf_counter()
+        return events
+
+    def end_frame(self, cap=True):
+        """
+        Records the frame time and caps the frame rate at fps (a no-op
+        after a long idle wait). With cap=False it returns at once.
+        """
+        self.frames += 1
+        if self._frame_start is not None:
+            self.frame_times.append(time.perf_counter() - self._frame_start)
+            self._frame_start = None
+        return self.clock.tick(self.fps if cap else 0)
+
+    def stats(self):
+        """
+        Returns the frame counters and the average, median, 95th
+        percentile and worst frame time (ms) of the recorded frames.
+        """
+        times = sorted(self.frame_times)
+        def ms(seconds):
+            return round(seconds * 1000, 3)
+        return {
+            "frames": self.frames,
+            "idle_waits": self.idle_waits,
+            "idle_timeouts": self.idle_timeouts,
+            "fps": round(self.clock.get_fps(), 1),
+            "frame_ms_avg": ms(sum(times) / len(times)) if times else 0.0,
+            "frame_ms_p50": ms(times[len(times) // 2]) if times else 0.0,
+            "frame_ms_p95": ms(times[int(len(times) * 0.95)]) if times else 0.0,
+            "frame_ms_max": ms(times[-1]) if times else 0.0,
+        }
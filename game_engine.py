@@ -0,0 +1,324 @@
+import random
+import sys
+import time
+
+from roster import Roster, TEAMS
+from scoreboard import Scoreboard
+from wire_format import parse_hit
+
+# ---------------------------------------------------------
+# Game Rules
+# ---------------------------------------------------------
+COUNTDOWN_SECONDS = 30
+GAME_SECONDS = 6 * 60
+
+TAG_POINTS = 10      # tagging an opponent; a teammate costs both players this much
+BASE_POINTS = 100    # tagging the other team's base
+
+# Equipment codes of the bases (a hit with one of these as the target).
+GREEN_BASE = 43
+RED_BASE = 53
+BASE_OWNER = {GREEN_BASE: "green", RED_BASE: "red"}
+
+# Control codes sent to the equipment when the game starts and ends.
+START_CODE = 202
+END_CODE = 221
+
+# Game states, in order.
+SETUP = "setup"
+COUNTDOWN = "countdown"
+PLAYING = "playing"
+ENDED = "ended"
+
+class GameUpdate:
+    """
+    One change emitted by the engine. `kind` is "state" (the game moved
+    to `state`), "tag", "friendly_fire" or "base". For scoring updates,
+    `player_id`/`target_id` are the players involved, `points` maps player
+    ID -> points gained (negative for a loss), and `reply` is the
+    equipment code to transmit back, if any (a list for control codes).
+    """
+    __slots__ = ("time", "kind", "state", "player_id", "target_id", "points", "reply")
+
+    def __init__(self, time, kind, state=None, player_id=None, target_id=None, points=None, reply=None):
+        self.time = time
+        self.kind = kind
+        self.state = state
+        self.player_id = player_id
+        self.target_id = target_id
+        self.points = points
+        self.reply = reply
+
+    def __repr__(self):
+        return f"GameUpdate({self.time:.3f}, {self.kind!r}, {self.state or self.points!r})"
+
+# ---------------------------------------------------------
+# Game Engine
+# ---------------------------------------------------------
+class GameEngine:
+    """
+    The game state machine, roster and scoring, with no pygame or network
+    code. Feed it timestamped equipment events (hit(), handle_message())
+    and advance the clock with tick(); it applies the scoring rules and
+    passes a GameUpdate to every subscribed observer for each change.
+    Scores live in an incremental Scoreboard, so a hit costs the same
+    however many players there are. Timestamps are seconds on any
+    monotonic clock.
+    """
+    def __init__(self, roster=None, countdown=COUNTDOWN_SECONDS, duration=GAME_SECONDS):
+        self.roster = roster if roster is not None else Roster()
+        self.countdown = countdown
+        self.duration = duration
+        self.scoreboard = Scoreboard()
+        self._observers = []
+        self.reset()
+
+    def reset(self):
+        """
+        Back to setup with every score cleared. The roster is kept, and
+        every player on it starts the scoreboard at 0.
+        """
+        self.state = SETUP
+        self.started_at = None     # when the countdown began
+        self.play_starts = None
+        self.play_ends = None
+        self.scoreboard.reset()
+        for player in self.roster.by_id.values():
+            self.scoreboard.add_player(player.player_id, player.team)
+        self.base_hits = set()     # player IDs that have tagged a base
+        self.events = 0
+        self.ignored = 0
+
+    @property
+    def scores(self):
+        """
+        Player ID -> score.
+        """
+        return self.scoreboard.scores
+
+    @property
+    def team_scores(self):
+        """
+        Team -> total score.
+        """
+        return self.scoreboard.totals
+
+    def subscribe(self, observer):
+        """
+        Calls observer(update) for every GameUpdate from now on.
+        """
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer):
+        self._observers.remove(observer)
+
+    def _emit(self, update):
+        for observer in self._observers:
+            observer(update)
+        return update
+
+    def _set_state(self, state, now, reply=None):
+        self.state = state
+        return self._emit(GameUpdate(now, "state", state=state, reply=reply))
+
+    # ----- Clock -----
+
+    def start(self, now):
+        """
+        Starts the countdown (from setup or after a finished game). Scores
+        from a previous game are cleared.
+        """
+        if self.state in (COUNTDOWN, PLAYING):
+            return
+        self.reset()
+        self.started_at = now
+        self.play_starts = now + self.countdown
+        self.play_ends = self.play_starts + self.duration
+        self._set_state(COUNTDOWN, now)
+        self.tick(now)
+
+    def tick(self, now):
+        """
+        Advances the state machine to time `now`: countdown -> playing
+        (sends the start code) -> ended (sends the end code three times).
+        """
+        if self.state == COUNTDOWN and now >= self.play_starts:
+            self._set_state(PLAYING, self.play_starts, reply=[START_CODE])
+        if self.state == PLAYING and now >= self.play_ends:
+            self._set_state(ENDED, self.play_ends, reply=[END_CODE] * 3)
+
+    def stop(self, now):
+        """
+        Ends the game early. The end code is only sent if play had
+        started; a cancelled countdown just ends.
+        """
+        if self.state == COUNTDOWN:
+            self.play_ends = now
+            self._set_state(ENDED, now)
+        elif self.state == PLAYING:
+            self.play_ends = now
+            self._set_state(ENDED, now, reply=[END_CODE] * 3)
+
+    def remaining(self, now):
+        """
+        Seconds left in the current phase (countdown or game), else 0.
+        """
+        if self.state == COUNTDOWN:
+            return max(self.play_starts - now, 0.0)
+        if self.state == PLAYING:
+            return max(self.play_ends - now, 0.0)
+        return 0.0
+
+    # ----- Equipment Events -----
+
+    def handle_message(self, now, data):
+        """
+        Applies a received hit message (text "shooter:target" or binary).
+        Returns the GameUpdate, or None if it was ignored.
+        """
+        hit = parse_hit(data)
+        if hit is None:
+            self.ignored += 1
+            return None
+        return self.hit(now, hit[0], hit[1])
+
+    def hit(self, now, shooter_equipment, target_equipment):
+        """
+        Applies one hit by equipment IDs at time `now`. Hits outside the
+        game or from unknown equipment are ignored (returns None).
+        """
+        self.tick(now)
+        self.events += 1
+        shooter = self.roster.for_equipment(shooter_equipment)
+        if self.state != PLAYING or shooter is None:
+            self.ignored += 1
+            return None
+
+        base_team = BASE_OWNER.get(target_equipment)
+        if base_team is not None:
+            if base_team == shooter.team:
+                self.ignored += 1
+                return None
+            self.base_hits.add(shooter.player_id)
+            return self._score(now, "base", shooter, None, {shooter.player_id: BASE_POINTS}, None)
+
+        target = self.roster.for_equipment(target_equipment)
+        if target is None or target is shooter:
+            self.ignored += 1
+            return None
+        if target.team == shooter.team:
+            points = {shooter.player_id: -TAG_POINTS, target.player_id: -TAG_POINTS}
+            return self._score(now, "friendly_fire", shooter, target, points, shooter_equipment)
+        return self._score(now, "tag", shooter, target, {shooter.player_id: TAG_POINTS}, target_equipment)
+
+    def _score(self, now, kind, shooter, target, points, reply):
+        for player_id, delta in points.items():
+            self.scoreboard.add(player_id, delta, self.roster.get(player_id).team)
+        return self._emit(GameUpdate(now, kind, player_id=shooter.player_id,
+                                     target_id=target.player_id if target else None,
+                                     points=points, reply=reply))
+
+    # ----- Views -----
+
+    def score(self, player_id):
+        return self.scoreboard.score(player_id)
+
+    def leaderboard(self, team, limit=None):
+        """
+        Returns (player, score) for a team's players, highest score first.
+        """
+        ranked = []
+        for player_id, score in self.scoreboard.ranked(team, limit):
+            player = self.roster.get(player_id)
+            if player is not None:
+                ranked.append((player, score))
+        return ranked
+
+    def leading_team(self):
+        """
+        Returns the team with the highest score, or None on a tie.
+        """
+        return self.scoreboard.leading_team()
+
+# ---------------------------------------------------------
+# Match Simulation
+# ---------------------------------------------------------
+def simulate_match(engine, rng, hits, base_ratio=0.02, junk_ratio=0.01):
+    """
+    Plays one match on an engine whose roster is already filled: starts
+    it, feeds `hits` random timestamped hits spread over the game, ends
+    it, and checks the totals against an independent count of the rules.
+    Returns the number of hits applied. Raises AssertionError on a
+    scoring mismatch.
+    """
+    players = list(engine.roster.by_id.values())
+    equipment = [p.equipment for p in players]
+    engine.start(0.0)
+    expected = {team: 0 for team in TEAMS}
+    step = engine.duration / (hits + 1)
+    now = engine.play_starts
+    applied = 0
+    for _ in range(hits):
+        now += step
+        shooter = rng.choice(players)
+        roll = rng.random()
+        if roll < junk_ratio:
+            engine.handle_message(now, b"garbage")
+            continue
+        if roll < junk_ratio + base_ratio:
+            target = RED_BASE if shooter.team == "green" else GREEN_BASE
+            expected[shooter.team] += BASE_POINTS
+        else:
+            target_player = rng.choice(players)
+            target = target_player.equipment
+            if target_player is shooter:
+                pass
+            elif target_player.team == shooter.team:
+                expected[shooter.team] -= 2 * TAG_POINTS
+            else:
+                expected[shooter.team] += TAG_POINTS
+        if engine.hit(now, shooter.equipment, target) is not None:
+            applied += 1
+    engine.tick(engine.play_ends)
+    assert engine.state == ENDED, engine.state
+    assert engine.team_scores == expected, (engine.team_scores, expected)
+    assert sum(engine.scores.values()) == sum(expected.values())
+    assert len(set(equipment)) == len(equipment)
+    return applied
+
+def simulate(matches=1000, players_per_team=15, hits=500, seed=None):
+    """
+    Simulates `matches` complete matches and prints the throughput.
+    """
+    rng = random.Random(seed)
+    engine = GameEngine()
+    for i in range(players_per_team * 2):
+        team = TEAMS[i % 2]
+        engine.roster.add(i + 1, f"Player{i + 1}", 100 + i, team)
+    updates = [0]
+    engine.subscribe(lambda update: updates.__setitem__(0, updates[0] + 1))
+
+    begin = time.perf_counter()
+    applied = 0
+    for _ in range(matches):
+        applied += simulate_match(engine, rng, hits)
+    elapsed = time.perf_counter() - begin
+    print(f"{matches:,} matches, {matches * hits:,} hits ({applied:,} scored, {updates[0]:,} updates) "
+          f"in {elapsed:.2f} s: {matches / elapsed:,.0f} matches/s, {matches * hits / elapsed:,.0f} hits/s")
+    print("Final match scores:", engine.team_scores)
+    return engine
+
+def main():
+    usage = "Usage: python game_engine.py simulate [matches] [players_per_team] [hits_per_match] [seed]"
+    if len(sys.argv) < 2 or sys.argv[1] != "simulate":
+        print(usage)
+        sys.exit(1)
+    try:
+        numbers = [int(arg) for arg in sys.argv[2:6]]
+    except ValueError:
+        print(usage)
+        sys.exit(1)
+    simulate(*numbers)
+
+if __name__ == "__main__":
+    main()
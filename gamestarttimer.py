@@ -1,35 +1,40 @@
 import pygame
-import os
 
-def load_images():
-    images = {}
-    for i in range(31):  # 0 to 30
-        filename = f"countdown_images/{i}.tif"
-        if os.path.exists(filename):
-            images[i] = pygame.image.load(filename)
-        else:
-            print(f"Warning: {filename} not found")
-    return images
+from asset_bank import shared_bank
+
+# Where the countdown number is drawn on the background.
+NUMBER_POSITION = (171, 204)
 
 def main():
     pygame.init()
     print("Pygame initialized")
     screen = pygame.display.set_mode((586, 445))
     pygame.display.set_caption("Countdown Timer")
-    
+
     font = pygame.font.Font(None, 36)
     start_button = pygame.Rect(243, 350, 100, 50) #test button for the timer, will be replaced.
-    
-    images = load_images()
 
-    background = pygame.image.load("countdown_images/background.tif")  # Load background image
+    # Decoded in parallel and converted to the display format once.
+    bank = shared_bank().finalize()
+    print(f"Countdown images ready in {bank.load_seconds * 1000:.0f} ms")
+    background = bank.background
+
+    # The background and button are drawn once; after that only the
+    # number region is redrawn, when the number changes.
+    screen.blit(background, (0, 0)) # the background image drawn
+    pygame.draw.rect(screen, (0, 255, 0), start_button) #test button for the timer, will be replaced.
+    text = font.render("Start", True, (0, 0, 0))
+    screen.blit(text, (263, 365))
+    pygame.display.flip()
+
     running = True
     countdown = False
     start_time = None
+    shown_number = None
+    number_rect = None
     clock = pygame.time.Clock()
-    
+
     while running:
-        screen.blit(background, (0, 0)) # the background image drawn
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -37,29 +42,29 @@ def main():
                 if start_button.collidepoint(event.pos):
                     countdown = True
                     start_time = pygame.time.get_ticks()
-        
+
         if countdown and start_time:
             elapsed_time = (pygame.time.get_ticks() - start_time) // 1000
             remaining_time = max(30 - elapsed_time, 0)
-            if remaining_time in images:
-                image = images[remaining_time]
-                image_x = 171
-                image_y = 204
-                screen.blit(image, (image_x, image_y))
+            if remaining_time != shown_number and bank.has_frame(remaining_time):
+                dirty = []
+                if number_rect is not None:
+                    # Restore the background under the previous number.
+                    dirty.append(screen.blit(background, number_rect, number_rect))
+                number_rect = bank.blit_frame(screen, remaining_time, NUMBER_POSITION)
+                dirty.append(number_rect)
+                shown_number = remaining_time
+                pygame.display.update(dirty)
             if elapsed_time >= 30:
                 countdown = False
-        
-        pygame.draw.rect(screen, (0, 255, 0), start_button) #test button for the timer, will be replaced.
-        text = font.render("Start", True, (0, 0, 0))
-        screen.blit(text, (263, 365)) 
-        
-        pygame.display.flip()
+                if number_rect is not None:
+                    pygame.display.update(screen.blit(background, number_rect, number_rect))
+                    number_rect = shown_number = None
+
         clock.tick(30)
-    
+
     pygame.quit()
-   
+
 
 if __name__ == "__main__":
     main()
-
-
@@ -1,7 +1,29 @@
+import os
 import pygame
-import psycopg2
-import socket
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from database import check_player_exists, create_table_if_not_exists, upsert_player, CODENAME_MAX_LENGTH
+import asset_cache
+from asset_bank import shared_bank
+from db_pool import ConnectionPool
+from db_worker import DatabaseWorker, DB_RESULT
+from event_log import EventLog
+from frame_scheduler import FrameScheduler
+from game_engine import GameEngine, COUNTDOWN, PLAYING, ENDED
+from player_cache import CodenameCache
+from render_cache import TextCache
+from roster import Roster
+from roster_view import RosterView
+from udp_client import UDPSender
+from udp_server import UDPReceiver
+import wire_format
+
+# Start of the program, for the time-to-interactive measurement.
+STARTUP_TIME = time.perf_counter()
 
 # ---------------------------------------------------------
 # Configuration and Initialization
@@ -16,20 +38,45 @@ DB_HOST = "localhost"
 UDP_PORT = 7500
 DEFAULT_UDP_IP = "127.0.0.1"
 
-# Initialize Pygame and font system.
-pygame.init()
+# Equipment hit messages are received on this port during a game.
+UDP_RECEIVE_IP = "0.0.0.0"
+UDP_RECEIVE_PORT = 7501
+
+# Wire format for equipment IDs and game codes: "text" (plain number) or
+# "binary" (fixed 10-byte record from wire_format.py). Receivers accept both.
+UDP_WIRE_FORMAT = "text"
+
+# Initialize the font system. Fonts work without a display, so the
+# widgets below can be built at import; the window is opened by init_app().
 pygame.font.init()
 
-# Set up main screen dimensions and create a display surface.
+# Main screen dimensions; `screen` is the display surface once it exists.
 SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Laser Tag - Player Entry")
+screen = None
+
+# Set PHOTON_HEADLESS=1 (or pass --headless) to render offscreen through
+# the SDL dummy video driver, e.g. for automated load runs.
+HEADLESS_ENV = "PHOTON_HEADLESS"
 
 # Basic font for rendering text.
 FONT = pygame.font.Font(None, 28)
 
-# Clock for controlling the frame rate.
-CLOCK = pygame.time.Clock()
+# Rendered text surfaces are cached, so unchanged labels and codenames
+# are not rasterized again every frame.
+TEXT_CACHE = TextCache(maxsize=512)
+
+def render_text(text, color, font=FONT):
+    """
+    Returns a (cached) surface with the text rendered in the given color.
+    """
+    return TEXT_CACHE.render(font, text, color)
+
+# Controls the frame rate: full rate while something animates, otherwise
+# the loop sleeps until input, a database result or a timer event arrives.
+FRAME_SCHEDULER = FrameScheduler(fps=30, idle_timeout_ms=1000)
+
+# States that redraw every frame whether or not any event arrived.
+ANIMATED_STATES = ("splash", "game")
 
 # ---------------------------------------------------------
 # Color Definitions
@@ -51,72 +98,110 @@ GREEN_SUBHEADER = (0, 100, 0)
 RED_SUBHEADER = (150, 0, 0)
 
 # ---------------------------------------------------------
-# Attempt to Load a Splash Image
+# Splash Image (Loaded in the Background)
 # ---------------------------------------------------------
-# This is displayed briefly at program startup.
-try:
-    splash_image = pygame.image.load("logo.jpg")
-    splash_image = pygame.transform.scale(splash_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-except Exception as e:
-    print("Error loading splash image:", e)
-    splash_image = None
+# The splash shows for at least SPLASH_MIN_SECONDS and until the logo and
+# the database warmup are ready, but never longer than SPLASH_MAX_SECONDS.
+# Any key skips it.
+SPLASH_MIN_SECONDS = 1.0
+SPLASH_MAX_SECONDS = 3.0
+SPLASH_IMAGE_PATH = "logo.jpg"
+
+# Set by init_app(): the background load of the logo, the logo once
+# loaded, and the countdown images (shared with gamestarttimer.py).
+splash_future = None
+splash_image = None
+COUNTDOWN_ASSETS = None
 
 # ---------------------------------------------------------
 # Database and UDP Helper Functions
 # ---------------------------------------------------------
-def get_db_connection():
+# Shared pool of database connections. Connections are opened on first
+# use and kept open, so each lookup costs one round trip instead of a
+# full connect + authenticate handshake.
+DB_POOL = ConnectionPool(
+    maxconn=4, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST
+)
+
+# All SQL runs on this background worker so the render loop never blocks.
+# Finished jobs come back to the event loop as DB_RESULT events.
+DB_WORKER = DatabaseWorker(DB_POOL)
+
+# Codenames of known players, warmed at startup and kept current on every
+# write, so Step 1 lookups for regulars skip the database entirely.
+CODENAME_CACHE = CodenameCache(maxsize=10000)
+
+# Every datagram sent and received during a game is recorded here, one
+# log file per game (see event_log.py).
+EVENT_LOG = EventLog("game_logs")
+
+# One long-lived sender; it keeps a socket open per destination (broadcast
+# sockets get SO_BROADCAST) so each message is a single send call.
+UDP_SENDER = UDPSender(log=EVENT_LOG)
+udp_sequence = 0
+
+def send_udp_message(target_ip, message, port=UDP_PORT, msg_type=wire_format.EQUIPMENT):
     """
-    Attempts to connect to the PostgreSQL database using the
-    global parameters. Returns the connection object if successful,
-    or None if there's an error.
-    """
-    try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST
-        )
-        return conn
-    except Exception as e:
-        print("Database connection error:", e)
-        return None
-
-def send_udp_message(target_ip, message, port=UDP_PORT):
-    """
-    Sends a UDP message to the specified target IP and port.
-    If the target_ip is broadcast, it sets the socket to broadcast mode.
+    Sends a UDP message to the specified target IP and port
+    using the shared UDP_SENDER. With the binary wire format,
+    the message is sent as a numbered record of msg_type:
+    EQUIPMENT for equipment IDs, CONTROL for game codes. Returns
+    True if it was sent; failures are printed.
     """
+    global udp_sequence
+    if UDP_WIRE_FORMAT == "binary":
+        code = int(message) if str(message).isdigit() else None
+        if code is None or code > 0xFFFF:
+            print(f"UDP send error: '{message}' does not fit the binary format (0-65535).")
+            return False
+        udp_sequence += 1
+        data = wire_format.encode(msg_type, code, 0, udp_sequence)
+    else:
+        data = message
     try:
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        if target_ip == "255.255.255.255":
-            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        client_socket.sendto(str(message).encode(), (target_ip, port))
-        client_socket.close()
-        print(f"Sent message '{message}' to {target_ip}:{port}")
-    except Exception as e:
+        UDP_SENDER.send(data, target_ip, port)
+    except OSError as e:
         print("UDP send error:", e)
-
-def create_table_if_not_exists(cursor):
-    """
-    Creates a table named 'players' in the database if it does not exist.
-    It has columns 'id' (int) and 'codename' (varchar).
-    """
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS players (
-        id INT PRIMARY KEY,
-        codename VARCHAR(30)
-    );
-    """
-    cursor.execute(create_table_query)
+        return False
+    print(f"Sent message '{message}' to {target_ip}:{port}")
+    return True
 
 # ---------------------------------------------------------
 # Database Initialization (Create Table If Needed)
 # ---------------------------------------------------------
-conn = get_db_connection()
-if conn:
+def init_database(conn):
+    """
+    Makes sure the players table exists and warms the codename cache.
+    """
     cursor = conn.cursor()
     create_table_if_not_exists(cursor)
     conn.commit()
     cursor.close()
-    conn.close()
+    CODENAME_CACHE.warm(conn)
+
+# The init job, submitted by init_app() so it runs during the splash.
+db_init_future = None
+
+def lookup_codename(conn, player_id):
+    """
+    Returns the stored codename for player_id, or None if the
+    player is not in the database. Found codenames are cached.
+    """
+    cursor = conn.cursor()
+    result = check_player_exists(cursor, player_id)
+    cursor.close()
+    if result and result[0] is not None:
+        CODENAME_CACHE.put(player_id, result[0])
+        return result[0]
+    return None
+
+def save_player(conn, player_id, codename):
+    """
+    Writes the player to the database. The codename cache is updated by
+    handle_db_result once the write has succeeded, so a failed write
+    leaves the cached codename alone.
+    """
+    upsert_player(conn, player_id, codename)
 
 # ---------------------------------------------------------
 # UI Helper Classes
@@ -131,7 +216,7 @@ class InputBox:
         self.text = text
         self.text_color = text_color
         self.bg_color = bg_color
-        self.txt_surface = FONT.render(text, True, self.text_color)
+        self.txt_surface = render_text(text, self.text_color)
         self.active = False
         self.color = COLOR_ACTIVE if self.active else COLOR_INACTIVE
 
@@ -157,7 +242,14 @@ class InputBox:
                 self.text = self.text[:-1]
             else:
                 self.text += event.unicode
-            self.txt_surface = FONT.render(self.text, True, self.text_color)
+            self.txt_surface = render_text(self.text, self.text_color)
+
+    def look(self):
+        """
+        Returns everything that affects how the box is drawn, so
+        callers can skip redrawing it when nothing changed.
+        """
+        return (self.text, self.active, self.rect.w)
 
     def update(self):
         """
@@ -184,7 +276,7 @@ class Button:
         self.rect = pygame.Rect(x, y, w, h)
         self.text = text
         self.callback = callback
-        self.txt_surface = FONT.render(text, True, TEXT_COLOR)
+        self.txt_surface = render_text(text, TEXT_COLOR)
         self.focused = False
         self.bg_color = bg_color if bg_color is not None else BUTTON_COLOR
 
@@ -207,6 +299,14 @@ class Button:
             if event.key == pygame.K_RETURN:
                 self.callback()
 
+    def look(self, disable_tab_highlight=False):
+        """
+        Returns everything that affects how the button is drawn
+        (text, hover and visible focus outline).
+        """
+        hovered = self.rect.collidepoint(pygame.mouse.get_pos())
+        return (self.text, hovered, self.focused and not disable_tab_highlight)
+
     def update(self):
         """
         Updates the hover state (whether the mouse is over the button).
@@ -233,8 +333,11 @@ class Button:
 # The application states: splash, main, popup, game.
 state = "splash"
 
-# In-memory data for teams: "green" and "red" each hold a list of player dictionaries.
-players_table = {"green": [], "red": []}
+# In-memory roster for both teams, indexed by player ID and equipment ID.
+ROSTER = Roster()
+
+# Text typed on the main screen to search both team tables.
+search_text = ""
 
 # Variables to handle popups (the "wizard" for adding players, or update popup).
 popup_rect = None
@@ -244,6 +347,14 @@ popup_info_text = ""
 popup_mode = None     # "add" or "update"
 popup_step = 0        # For multi-step add wizard
 
+# Database job the popup is waiting on. While set, the popup shows
+# popup_pending_text and ignores input until the DB_RESULT arrives,
+# Escape is pressed or DB_JOB_TIMEOUT seconds pass.
+popup_pending_job = None
+popup_pending_text = ""
+popup_pending_since = 0.0
+DB_JOB_TIMEOUT = 10.0
+
 # Variables for the add-player wizard. They store data between steps.
 wizard_player_id = None
 wizard_codename = ""
@@ -309,22 +420,24 @@ def add_player_step1_next():
 
     wizard_player_id = int(player_id_str)
 
-    # Check database for an existing codename.
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT codename FROM players WHERE id = %s;", (wizard_player_id,))
-        result = cursor.fetchone()
-        if result:
-            wizard_codename = result[0]
-        else:
-            wizard_codename = ""
-        cursor.close()
-        conn.close()
-    else:
-        popup_info_text = "Database connection error."
+    # Known players are answered straight from the codename cache.
+    player_id = wizard_player_id
+    cached = CODENAME_CACHE.get(player_id)
+    if cached is not None:
+        popup_info_text = ""
+        finish_add_player_step1(cached)
         return
 
+    # Otherwise check the database on the worker thread.
+    # The wizard continues in finish_add_player_step1 once it answers.
+    start_db_job("lookup", lambda conn: lookup_codename(conn, player_id), "Looking up player...")
+
+def finish_add_player_step1(codename):
+    """
+    Called with the looked-up codename (or None) and moves to Step 2.
+    """
+    global wizard_codename
+    wizard_codename = codename if codename else ""
     init_popup_step2()
 
 # Step 2: Ask for Codename
@@ -350,8 +463,16 @@ def add_player_step2_next():
     """
     Stores the entered/updated codename and proceeds to Step 3.
     """
-    global wizard_codename, popup_widgets
-    wizard_codename = popup_widgets[0].text.strip()
+    global wizard_codename, popup_widgets, popup_info_text
+    codename = popup_widgets[0].text.strip()
+    if codename == "":
+        popup_info_text = "Codename cannot be empty."
+        return
+    if len(codename) > CODENAME_MAX_LENGTH:
+        popup_info_text = f"Codename can be at most {CODENAME_MAX_LENGTH} characters."
+        return
+    wizard_codename = codename
+    popup_info_text = ""
     init_popup_step3()
 
 # Step 3: Ask for Equipment ID and UDP Target IP
@@ -408,51 +529,27 @@ def init_popup_step4():
 
 def add_player_step4_submit(team):
     """
-    Final step: uses the chosen team, updates or inserts the player
-    in the database, sends a UDP message with the equipment ID,
-    and updates the in-memory table for display.
+    Final step: uses the chosen team and queues the database update or
+    insert. finish_add_player completes the wizard once it succeeds.
     """
-    global wizard_team, wizard_player_id, wizard_codename, wizard_equipment, wizard_udp_ip
-    global players_table, state, popup_info_text
-
+    global wizard_team
     wizard_team = team
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        create_table_if_not_exists(cursor)
-        conn.commit()
-        cursor.execute("SELECT codename FROM players WHERE id = %s;", (wizard_player_id,))
-        result = cursor.fetchone()
-
-        # If the player ID exists, possibly update the codename.
-        if result:
-            if wizard_codename != result[0]:
-                cursor.execute("UPDATE players SET codename = %s WHERE id = %s;", (wizard_codename, wizard_player_id))
-                conn.commit()
-        else:
-            # If no player found, insert new record, requiring a non-empty codename.
-            if wizard_codename == "":
-                popup_info_text = "Codename cannot be empty."
-                cursor.close()
-                conn.close()
-                return
-            cursor.execute("INSERT INTO players (id, codename) VALUES (%s, %s);", (wizard_player_id, wizard_codename))
-            conn.commit()
-        cursor.close()
-        conn.close()
-    else:
-        popup_info_text = "Database connection error."
-        return
+    player_id, codename = wizard_player_id, wizard_codename
+    start_db_job("add", lambda conn: save_player(conn, player_id, codename), "Saving player...",
+                 player_id=player_id, codename=codename)
+
+def finish_add_player():
+    """
+    Called once the add wizard's database write succeeded: sends the
+    equipment ID and adds the player to the in-memory table.
+    """
+    global state, popup_info_text
 
     # Send the equipment ID via UDP.
     send_udp_message(wizard_udp_ip, wizard_equipment)
 
-    # Update the local table for display.
-    players_table[wizard_team].append({
-        "player_id": str(wizard_player_id),
-        "codename": wizard_codename,
-        "equipment": str(wizard_equipment)
-    })
+    # Update the local roster for display.
+    ROSTER.add(wizard_player_id, wizard_codename, wizard_equipment, wizard_team)
 
     popup_info_text = ""
     state = "main"
@@ -509,7 +606,7 @@ def update_player_submit():
     Reads the input fields, validates them, updates/inserts the record
     in the database, sends a UDP message, and updates the local table.
     """
-    global popup_widgets, players_table, state, popup_info_text
+    global popup_widgets, state, popup_info_text
     player_id_str = popup_widgets[0].text.strip()
     codename = popup_widgets[1].text.strip()
     equipment_str = popup_widgets[2].text.strip()
@@ -526,56 +623,115 @@ def update_player_submit():
     if team not in ["green", "red"]:
         popup_info_text = "Team must be 'green' or 'red'."
         return
+    if codename == "":
+        popup_info_text = "Codename cannot be empty."
+        return
+    if len(codename) > CODENAME_MAX_LENGTH:
+        popup_info_text = f"Codename can be at most {CODENAME_MAX_LENGTH} characters."
+        return
 
     player_id = int(player_id_str)
     equipment = int(equipment_str)
 
-    # Database operations for update or insert.
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        create_table_if_not_exists(cursor)
-        conn.commit()
-        cursor.execute("SELECT codename FROM players WHERE id = %s;", (player_id,))
-        result = cursor.fetchone()
-        if result:
-            # If a record exists, update the codename if changed.
-            if codename != result[0]:
-                cursor.execute("UPDATE players SET codename = %s WHERE id = %s;", (codename, player_id))
-                conn.commit()
-        else:
-            # Insert new record if not found.
-            if codename == "":
-                popup_info_text = "Codename cannot be empty."
-                cursor.close()
-                conn.close()
-                return
-            cursor.execute("INSERT INTO players (id, codename) VALUES (%s, %s);", (player_id, codename))
-            conn.commit()
-        cursor.close()
-        conn.close()
-    else:
-        popup_info_text = "Database connection error."
-        return
+    # Database operations for update or insert run on the worker thread;
+    # the rest happens in finish_update_player once the write succeeds.
+    start_db_job("update", lambda conn: save_player(conn, player_id, codename), "Saving player...",
+                 player_id=player_id, codename=codename, equipment=equipment,
+                 udp_ip=udp_ip, team=team)
+
+def finish_update_player(player_id, codename, equipment, udp_ip, team):
+    """
+    Called once the update popup's database write succeeded: sends the
+    equipment ID and moves the player to the chosen team.
+    """
+    global state, popup_info_text
 
     # Send the equipment ID via UDP.
     send_udp_message(udp_ip, equipment)
 
-    # Remove any existing entry for this player from both teams.
-    for team_key in players_table:
-        players_table[team_key] = [p for p in players_table[team_key] if p["player_id"] != player_id_str]
-
-    # Add updated player info to the chosen team.
-    players_table[team].append({
-        "player_id": player_id_str,
-        "codename": codename,
-        "equipment": equipment_str
-    })
+    # Update the player in place, moving them if the team changed.
+    ROSTER.add(player_id, codename, equipment, team)
 
     popup_info_text = ""
     state = "main"
     set_main_focus(0)
 
+# ---------------------------------------------------------
+# Background Database Jobs
+# ---------------------------------------------------------
+def start_db_job(job, func, pending_text, **info):
+    """
+    Submits a database job for the open popup and puts the popup into
+    its pending state until the matching DB_RESULT event arrives.
+    """
+    global popup_pending_job, popup_pending_text, popup_pending_since, popup_info_text
+    job_id, _ = DB_WORKER.submit(job, func, **info)
+    popup_pending_job = job_id
+    popup_pending_text = pending_text
+    popup_pending_since = time.monotonic()
+    popup_info_text = ""
+
+def cancel_db_job(message):
+    """
+    Stops the popup waiting on its database job and shows message.
+    A result that still arrives for the job is ignored.
+    """
+    global popup_pending_job, popup_pending_text, popup_info_text
+    popup_pending_job = None
+    popup_pending_text = ""
+    popup_info_text = message
+
+def check_db_timeout():
+    """
+    Gives up on the popup's database job once it has run longer than
+    DB_JOB_TIMEOUT. Returns True if it timed out.
+    """
+    if popup_pending_job is None or time.monotonic() - popup_pending_since < DB_JOB_TIMEOUT:
+        return False
+    print("Database job timed out.")
+    cancel_db_job("Database did not respond. Try again.")
+    return True
+
+def db_error_text(error):
+    """
+    Returns the popup message for a failed database job.
+    """
+    if isinstance(error, psycopg2.OperationalError):
+        return "Database connection error."
+    if isinstance(error, psycopg2.DataError):
+        return "The database rejected this data."
+    return "Database error. See the console for details."
+
+def handle_db_result(event):
+    """
+    Handles a finished database job posted by the worker thread.
+    Results for popups that were closed in the meantime are ignored.
+    """
+    global popup_pending_job, popup_pending_text, popup_info_text
+    error = event.future.exception()
+    if error is not None:
+        print(f"Database job '{event.job}' failed:", error)
+    elif event.job in ("add", "update"):
+        # The write went through (even if its popup has since closed).
+        CODENAME_CACHE.put(event.player_id, event.codename)
+
+    if event.job_id != popup_pending_job or state != "popup":
+        return
+    popup_pending_job = None
+    popup_pending_text = ""
+    if error is not None:
+        popup_info_text = db_error_text(error)
+        return
+
+    result = event.future.result()
+    if event.job == "lookup":
+        finish_add_player_step1(result)
+    elif event.job == "add":
+        finish_add_player()
+    elif event.job == "update":
+        finish_update_player(event.player_id, event.codename, event.equipment,
+                             event.udp_ip, event.team)
+
 def update_player_cancel():
     """
     Closes the update popup and returns to main state without saving.
@@ -588,19 +744,85 @@ def update_player_cancel():
 # ---------------------------------------------------------
 # Main Screen Drawing
 # ---------------------------------------------------------
-def draw_main_screen():
+# Layout of the team table, shared by the static background
+# and the per-row updates.
+TABLE_AREA = pygame.Rect(50, 50, SCREEN_WIDTH - 100, 450)
+TABLE_HEADER_HEIGHT = 40
+TABLE_SUBHEADER_HEIGHT = 30
+TABLE_NUM_ROWS = 10
+TABLE_LEFT_COL_WIDTH = 50
+
+# Each team table shows a TABLE_NUM_ROWS window onto its players, which
+# scrolls (mouse wheel, Page Up/Down, Home/End), sorts (click the
+# subheader) and filters (type on the main screen).
+TEAM_VIEWS = {team: RosterView(ROSTER, team, TABLE_NUM_ROWS) for team in ("green", "red")}
+SORT_LABELS = {"joined": "Codename", "codename": "Codename (A-Z)", "id": "Codename (by ID)"}
+
+# The static table chrome is drawn once into main_background. Each frame
+# only restores and redraws the parts that changed; main_drawn remembers
+# what is currently on screen for each row and button.
+main_background = None
+main_drawn = {}
+
+def team_body_rects():
     """
-    Draws the main player-entry screen with a table layout for
-    green and red teams, along with the main screen buttons.
+    Returns the body (row area) rectangle of each team column.
     """
-    screen.fill(BG_COLOR)
+    col_width = TABLE_AREA.width // 2
+    top = TABLE_AREA.y + TABLE_HEADER_HEIGHT + TABLE_SUBHEADER_HEIGHT
+    height = TABLE_AREA.height - TABLE_HEADER_HEIGHT - TABLE_SUBHEADER_HEIGHT
+    return {
+        "green": pygame.Rect(TABLE_AREA.x, top, col_width, height),
+        "red": pygame.Rect(TABLE_AREA.x + col_width, top, col_width, height),
+    }
+
+def codename_cell_rect(body, row):
+    """
+    Returns the codename cell of a row, inside the grid lines.
+    """
+    row_height = body.height / TABLE_NUM_ROWS
+    top = int(body.y + row * row_height) + 1
+    bottom = int(body.y + (row + 1) * row_height)
+    return pygame.Rect(body.x + TABLE_LEFT_COL_WIDTH + 1, top, body.width - TABLE_LEFT_COL_WIDTH - 1, bottom - top)
+
+def number_cell_rect(body, row):
+    """
+    Returns the row number cell of a row, inside the grid lines.
+    """
+    cell = codename_cell_rect(body, row)
+    return pygame.Rect(body.x, cell.y, TABLE_LEFT_COL_WIDTH, cell.height)
+
+def subheader_rects():
+    """
+    Returns the subheader bar of each team column (click it to sort).
+    """
+    return {team: pygame.Rect(body.x, body.y - TABLE_SUBHEADER_HEIGHT, body.width, TABLE_SUBHEADER_HEIGHT)
+            for team, body in team_body_rects().items()}
+
+def status_rect(body):
+    """
+    Returns the line under a team column that shows which rows are visible.
+    """
+    return pygame.Rect(body.x, TABLE_AREA.bottom + 10, body.width, 30)
+
+SEARCH_RECT = pygame.Rect(TABLE_AREA.x, TABLE_AREA.bottom + 45, TABLE_AREA.width, 30)
+
+def build_main_background():
+    """
+    Draws everything on the main screen that never changes (shadow,
+    headers, team columns and grid) into a surface.
+    """
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if pygame.display.get_surface() is not None:
+        background = background.convert()
+    background.fill(BG_COLOR)
 
     # Main table area background
-    table_area = pygame.Rect(50, 50, SCREEN_WIDTH - 100, 450)
+    table_area = TABLE_AREA
     shadow = pygame.Surface((table_area.width, table_area.height), pygame.SRCALPHA)
     shadow.fill((0, 0, 0, 80))
-    screen.blit(shadow, (table_area.x + 5, table_area.y + 5))
-    pygame.draw.rect(screen, pygame.Color('grey20'), table_area, border_radius=10)
+    background.blit(shadow, (table_area.x + 5, table_area.y + 5))
+    pygame.draw.rect(background, pygame.Color('grey20'), table_area, border_radius=10)
     
     # Split the table area into two columns (green, red).
     col_width = table_area.width // 2
@@ -608,80 +830,207 @@ def draw_main_screen():
     red_area = pygame.Rect(table_area.x + col_width, table_area.y, col_width, table_area.height)
     
     # Headers for each team
-    header_height = 40
+    header_height = TABLE_HEADER_HEIGHT
     green_header = pygame.Rect(green_area.x, green_area.y, green_area.width, header_height)
     red_header = pygame.Rect(red_area.x, red_area.y, red_area.width, header_height)
-    pygame.draw.rect(screen, GREEN, green_header, border_radius=5)
-    pygame.draw.rect(screen, RED, red_header, border_radius=5)
-    header_green = FONT.render("Green Team", True, WHITE)
-    header_red = FONT.render("Red Team", True, WHITE)
-    screen.blit(header_green, (green_header.centerx - header_green.get_width() // 2,
-                               green_header.centery - header_green.get_height() // 2))
-    screen.blit(header_red, (red_header.centerx - header_red.get_width() // 2,
-                             red_header.centery - header_red.get_height() // 2))
+    pygame.draw.rect(background, GREEN, green_header, border_radius=5)
+    pygame.draw.rect(background, RED, red_header, border_radius=5)
+    header_green = render_text("Green Team", WHITE)
+    header_red = render_text("Red Team", WHITE)
+    background.blit(header_green, (green_header.centerx - header_green.get_width() // 2,
+                                   green_header.centery - header_green.get_height() // 2))
+    background.blit(header_red, (red_header.centerx - header_red.get_width() // 2,
+                                 red_header.centery - header_red.get_height() // 2))
     
     # Subheader bars for each team column
-    subheader_height = 30
+    subheader_height = TABLE_SUBHEADER_HEIGHT
     green_subheader = pygame.Rect(green_area.x, green_area.y + header_height, green_area.width, subheader_height)
     red_subheader = pygame.Rect(red_area.x, red_area.y + header_height, red_area.width, subheader_height)
-    pygame.draw.rect(screen, GREEN_SUBHEADER, green_subheader)
-    pygame.draw.rect(screen, RED_SUBHEADER, red_subheader)
-    subheader_label = FONT.render("Codename", True, WHITE)
-    screen.blit(subheader_label, (green_subheader.centerx - subheader_label.get_width() // 2,
-                                  green_subheader.y + (subheader_height - subheader_label.get_height()) // 2))
-    screen.blit(subheader_label, (red_subheader.centerx - subheader_label.get_width() // 2,
-                                  red_subheader.y + (subheader_height - subheader_label.get_height()) // 2))
+    pygame.draw.rect(background, GREEN_SUBHEADER, green_subheader)
+    pygame.draw.rect(background, RED_SUBHEADER, red_subheader)
     
     # Body areas for each team
-    green_body = pygame.Rect(green_area.x, green_area.y + header_height + subheader_height,
-                             green_area.width, green_area.height - header_height - subheader_height)
-    red_body = pygame.Rect(red_area.x, red_area.y + header_height + subheader_height,
-                           red_area.width, red_area.height - header_height - subheader_height)
+    bodies = team_body_rects()
+    green_body, red_body = bodies["green"], bodies["red"]
     dark_green = (0, 70, 0)
     dark_red = (100, 0, 0)
-    pygame.draw.rect(screen, dark_green, green_body)
-    pygame.draw.rect(screen, dark_red, red_body)
+    pygame.draw.rect(background, dark_green, green_body)
+    pygame.draw.rect(background, dark_red, red_body)
     
     # Draw a grid for each team body (10 rows).
-    num_rows = 10
+    num_rows = TABLE_NUM_ROWS
     row_height = green_body.height / num_rows
     grid_color = pygame.Color('grey50')
     for i in range(num_rows + 1):
         y = green_body.y + i * row_height
-        pygame.draw.line(screen, grid_color, (green_body.x, y), (green_body.x + green_body.width, y), 1)
-        pygame.draw.line(screen, grid_color, (red_body.x, y), (red_body.x + red_body.width, y), 1)
+        pygame.draw.line(background, grid_color, (green_body.x, y), (green_body.x + green_body.width, y), 1)
+        pygame.draw.line(background, grid_color, (red_body.x, y), (red_body.x + red_body.width, y), 1)
 
     # A vertical line to separate row numbers from codename in each body.
-    left_col_width = 50
-    pygame.draw.line(screen, grid_color, (green_body.x + left_col_width, green_body.y),
+    left_col_width = TABLE_LEFT_COL_WIDTH
+    pygame.draw.line(background, grid_color, (green_body.x + left_col_width, green_body.y),
                      (green_body.x + left_col_width, green_body.y + green_body.height), 1)
-    pygame.draw.line(screen, grid_color, (red_body.x + left_col_width, red_body.y),
+    pygame.draw.line(background, grid_color, (red_body.x + left_col_width, red_body.y),
                      (red_body.x + left_col_width, red_body.y + red_body.height), 1)
-    
-    # Fill in row numbers and codenames for green team.
-    for i in range(num_rows):
-        y = green_body.y + i * row_height
-        number_text = FONT.render(f"{i+1}", True, WHITE)
-        screen.blit(number_text, (green_body.x + 10, y + row_height/2 - number_text.get_height()/2))
-        if i < len(players_table["green"]):
-            codename_text = FONT.render(players_table["green"][i]["codename"], True, WHITE)
-            screen.blit(codename_text, (green_body.x + left_col_width + 10,
-                                        y + row_height/2 - codename_text.get_height()/2))
-    
-    # Fill in row numbers and codenames for red team.
-    for i in range(num_rows):
-        y = red_body.y + i * row_height
-        number_text = FONT.render(f"{i+1}", True, WHITE)
-        screen.blit(number_text, (red_body.x + 10, y + row_height/2 - number_text.get_height()/2))
-        if i < len(players_table["red"]):
-            codename_text = FONT.render(players_table["red"][i]["codename"], True, WHITE)
-            screen.blit(codename_text, (red_body.x + left_col_width + 10,
-                                        y + row_height/2 - codename_text.get_height()/2))
-    
-    # Draw the main screen buttons (Add Player, Update Player, Clear, Start).
-    main_any_hovered = any(widget.rect.collidepoint(pygame.mouse.get_pos()) for widget in main_widgets)
+    return background
+
+def draw_changed_text(key, rect, text, position, color=WHITE):
+    """
+    Redraws a text region (over the background) if its text changed since
+    the last frame. Returns the rect if it was redrawn, else None.
+    """
+    if key in main_drawn and main_drawn[key] == text:
+        return None
+    main_drawn[key] = text
+    screen.blit(main_background, rect, rect)
+    if text:
+        surface = render_text(text, color)
+        x, y = position(surface)
+        screen.set_clip(rect)
+        screen.blit(surface, (x, y))
+        screen.set_clip(None)
+    return rect
+
+def draw_main_screen(full_redraw=False):
+    """
+    Draws the main player-entry screen with a table layout for
+    green and red teams, along with the main screen buttons.
+    With full_redraw the whole static background is copied in;
+    otherwise only rows and buttons that changed since the last
+    frame are redrawn. Returns the list of changed rectangles.
+    """
+    global main_background
+    if main_background is None:
+        main_background = build_main_background()
+        full_redraw = True
+
+    dirty = []
+    if full_redraw:
+        screen.blit(main_background, (0, 0))
+        main_drawn.clear()
+        dirty.append(screen.get_rect())
+
+    # Fill in the visible window of each team, redrawing only rows that
+    # changed. Only TABLE_NUM_ROWS rows are looked at, however many
+    # players the team has.
+    row_height = next(iter(team_body_rects().values())).height / TABLE_NUM_ROWS
+    for team, body in team_body_rects().items():
+        view = TEAM_VIEWS[team]
+        window = view.window()
+        for i in range(TABLE_NUM_ROWS):
+            y = body.y + i * row_height
+            center_y = y + row_height/2
+            if i < len(window):
+                index, player = window[i]
+                number, codename = str(index + 1), player.codename
+            else:
+                number, codename = str(view.first + i + 1), None
+            for key, rect, text, x in (((team, i, "number"), number_cell_rect(body, i), number, body.x + 10),
+                                       ((team, i), codename_cell_rect(body, i), codename,
+                                        body.x + TABLE_LEFT_COL_WIDTH + 10)):
+                changed = draw_changed_text(key, rect, text, lambda surf, x=x: (x, center_y - surf.get_height()/2))
+                if changed:
+                    dirty.append(changed)
+
+        # Sort order in the subheader, and which rows are showing below.
+        subheader = subheader_rects()[team]
+        changed = draw_changed_text((team, "sort"), subheader, SORT_LABELS[view.sort],
+                                    lambda surf: (subheader.centerx - surf.get_width() // 2,
+                                                  subheader.y + (TABLE_SUBHEADER_HEIGHT - surf.get_height()) // 2))
+        if changed:
+            dirty.append(changed)
+        total = len(view)
+        status = ""
+        if view.query or total > TABLE_NUM_ROWS:
+            status = f"{min(view.first + 1, total)}-{view.first + len(window)} of {total}" if total else "No matches"
+        status_area = status_rect(body)
+        changed = draw_changed_text((team, "status"), status_area, status,
+                                    lambda surf: (status_area.centerx - surf.get_width() // 2, status_area.y))
+        if changed:
+            dirty.append(changed)
+
+    changed = draw_changed_text("search", SEARCH_RECT, f"Search: {search_text}" if search_text else "",
+                                lambda surf: (SEARCH_RECT.centerx - surf.get_width() // 2, SEARCH_RECT.y))
+    if changed:
+        dirty.append(changed)
+
+    # Draw the main screen buttons (Add Player, Update Player, Clear, Start)
+    # when their hover or focus outline changes.
+    mouse_pos = pygame.mouse.get_pos()
+    main_any_hovered = any(widget.rect.collidepoint(mouse_pos) for widget in main_widgets)
     for widget in main_widgets:
+        look = widget.look(disable_tab_highlight=main_any_hovered)
+        if main_drawn.get(widget) == look:
+            continue
+        main_drawn[widget] = look
+        screen.blit(main_background, widget.rect, widget.rect)
         widget.draw(screen, disable_tab_highlight=main_any_hovered)
+        dirty.append(widget.rect.copy())
+    return dirty
+
+# The popup is redrawn only when something in it changes.
+popup_drawn = None
+
+def popup_header_text():
+    """
+    Returns the popup header based on the mode and step (for add wizard).
+    """
+    if popup_mode == "add":
+        if popup_step == 1:
+            return "Step 1: Enter Player ID"
+        elif popup_step == 2:
+            return "Step 2: Enter/Update Codename"
+        elif popup_step == 3:
+            return "Step 3: Equipment ID & UDP IP"
+        elif popup_step == 4:
+            return "Step 4: Choose Team"
+    elif popup_mode == "update":
+        return "Update Player Information"
+    return ""
+
+def draw_popup(force=False):
+    """
+    Draws the popup area and its contents if anything in it changed
+    (or force is set). Returns the list of changed rectangles.
+    """
+    global popup_drawn
+    look = (popup_mode, popup_step, tuple(popup_rect), popup_info_text, popup_pending_job is not None,
+            popup_pending_text, tuple(widget.look() for widget in popup_widgets))
+    if not force and look == popup_drawn:
+        return []
+    popup_drawn = look
+
+    screen.set_clip(popup_rect)
+    pygame.draw.rect(screen, STORMY_BLUE, popup_rect, border_radius=10)
+    pygame.draw.rect(screen, pygame.Color('black'), popup_rect, 2, border_radius=10)
+
+    # Render and draw the popup header.
+    header_surf = render_text(popup_header_text(), WHITE)
+    screen.blit(header_surf, (popup_rect.x + 20, popup_rect.y + 20))
+
+    # If in update mode, label the first five widgets (the input boxes).
+    if popup_mode == "update":
+        labels = ["Player ID:", "Codename:", "Equipment ID:", "UDP Target IP:", "Team:"]
+        for i, widget in enumerate(popup_widgets[:5]):
+            label_surf = render_text(labels[i], WHITE)
+            # Position each label just above its input box.
+            label_y = widget.rect.y - label_surf.get_height() - 5
+            screen.blit(label_surf, (widget.rect.x, label_y))
+
+    # While waiting on the database, show the pending message instead.
+    if popup_pending_job is not None:
+        pending_surf = render_text(popup_pending_text, COLOR_INACTIVE)
+        screen.blit(pending_surf, (popup_rect.x + 20, popup_rect.bottom - 40))
+    # If there's an info/error message, draw it near the bottom of the popup.
+    elif popup_info_text:
+        info_surf = render_text(popup_info_text, pygame.Color('red'))
+        screen.blit(info_surf, (popup_rect.x + 20, popup_rect.bottom - 40))
+
+    # Draw all widgets (inputs, buttons) in the popup.
+    for widget in popup_widgets:
+        widget.draw(screen)
+    screen.set_clip(None)
+    return [popup_rect.copy()]
 
 # ---------------------------------------------------------
 # Main Screen Buttons & Navigation
@@ -716,39 +1065,199 @@ def move_main_focus_next():
 # Initialize the first focus on the main screen.
 set_main_focus(0)
 
+def set_search(text):
+    """
+    Filters both team tables by text (search as you type).
+    """
+    global search_text
+    search_text = text
+    for view in TEAM_VIEWS.values():
+        view.set_query(text)
+
+def handle_table_key(event):
+    """
+    Main screen keys for the team tables: Page Up/Down, Home and End
+    scroll both tables; typing searches, Backspace deletes a character
+    and Escape clears the search.
+    """
+    if event.key == pygame.K_PAGEUP:
+        for view in TEAM_VIEWS.values():
+            view.page(-1)
+    elif event.key == pygame.K_PAGEDOWN:
+        for view in TEAM_VIEWS.values():
+            view.page(1)
+    elif event.key == pygame.K_HOME:
+        for view in TEAM_VIEWS.values():
+            view.scroll_to(0)
+    elif event.key == pygame.K_END:
+        for view in TEAM_VIEWS.values():
+            view.scroll_to(-1)
+    elif event.key == pygame.K_BACKSPACE:
+        set_search(search_text[:-1])
+    elif event.key == pygame.K_ESCAPE:
+        set_search("")
+    elif event.key not in (pygame.K_RETURN, pygame.K_TAB) and event.unicode and event.unicode.isprintable():
+        set_search(search_text + event.unicode)
+
+def scroll_table_at(pos, rows):
+    """
+    Scrolls the team table under pos (the mouse wheel) by a number of rows.
+    """
+    for team, body in team_body_rects().items():
+        if body.collidepoint(pos):
+            TEAM_VIEWS[team].scroll(rows)
+
 def clear_players():
     """
     Clears all player entries from both teams in the in-memory table.
     """
-    global players_table
-    players_table = {"green": [], "red": []}
+    ROSTER.clear()
+
+# ---------------------------------------------------------
+# Game Screen
+# ---------------------------------------------------------
+# The game itself (state machine, scoring) lives in game_engine.py; this
+# screen only feeds it equipment events and draws what it reports.
+ENGINE = GameEngine(ROSTER)
+
+# Receives the equipment hit messages while a game runs.
+game_receiver = None
+
+# The most recent game events, newest last, for the event feed.
+GAME_FEED_LINES = 6
+game_feed = []
+
+def describe_update(update):
+    """
+    Returns a line of text for the event feed, or None.
+    """
+    if update.kind == "state":
+        return {COUNTDOWN: "Get ready!", PLAYING: "Game started!", ENDED: "Game over!"}.get(update.state)
+    shooter = ROSTER.get(update.player_id)
+    if update.kind == "base":
+        return f"{shooter.codename} scored on the base!"
+    target = ROSTER.get(update.target_id)
+    if update.kind == "friendly_fire":
+        return f"{shooter.codename} tagged teammate {target.codename}"
+    return f"{shooter.codename} tagged {target.codename}"
+
+def on_game_update(update):
+    """
+    Engine observer: transmits reply codes to the equipment and adds the
+    update to the event feed.
+    """
+    if update.reply is not None:
+        codes = update.reply if isinstance(update.reply, list) else [update.reply]
+        for code in codes:
+            send_udp_message(DEFAULT_UDP_IP, str(code), msg_type=wire_format.CONTROL)
+    line = describe_update(update)
+    if line:
+        game_feed.append(line)
+        del game_feed[:-GAME_FEED_LINES]
+
+ENGINE.subscribe(on_game_update)
+
+def handle_equipment_message(data, addr):
+    ENGINE.handle_message(time.monotonic(), data)
 
 def start_game():
     """
-    Switches the state to 'game' for a future game screen.
+    Switches to the game screen, starts the countdown and begins
+    listening for equipment messages.
     """
-    global state
+    global state, game_receiver
     state = "game"
+    game_feed.clear()
+    print("Recording game to", EVENT_LOG.rotate())
+    if game_receiver is None:
+        try:
+            game_receiver = UDPReceiver(UDP_RECEIVE_IP, UDP_RECEIVE_PORT, handler=handle_equipment_message,
+                                        log=EVENT_LOG)
+        except OSError as e:
+            print(f"Cannot receive on port {UDP_RECEIVE_PORT}:", e)
+    ENGINE.start(time.monotonic())
+
+def update_game():
+    """
+    Handles received equipment messages and advances the game clock.
+    Called once per frame on the game screen.
+    """
+    if game_receiver is not None:
+        game_receiver.poll(0)
+    ENGINE.tick(time.monotonic())
+
+# Players listed per team on the game screen.
+GAME_SCREEN_ROWS = 15
+
+def draw_team_scores(snapshot, team, x, color):
+    """
+    Draws one team's column from a scoreboard snapshot: the players by
+    score and the team total.
+    """
+    column = pygame.Rect(x, 80, 300, 480)
+    pygame.draw.rect(screen, color, column)
+    title = render_text(f"{team.capitalize()} Team", WHITE)
+    screen.blit(title, (column.x + 10, column.y + 10))
+    y = column.y + 50
+    for player_id, score in snapshot["ranked"][team]:
+        player = ROSTER.get(player_id)
+        if player is None:
+            continue
+        badge = "B " if player_id in ENGINE.base_hits else ""
+        screen.blit(render_text(badge + player.codename, WHITE), (column.x + 10, y))
+        points = render_text(str(score), WHITE)
+        screen.blit(points, (column.right - 10 - points.get_width(), y))
+        y += 27
+    total = render_text(f"Total: {snapshot['totals'][team]}", WHITE)
+    screen.blit(total, (column.right - 10 - total.get_width(), column.bottom - 35))
 
-# ---------------------------------------------------------
-# Game Screen (Stub)
-# ---------------------------------------------------------
 def draw_game_screen():
     """
-    Currently displays a placeholder message for the game screen.
+    Draws the play action screen from the engine: team scores, the
+    countdown or game timer, and the recent event feed.
     """
+    now = time.monotonic()
     screen.fill(BG_COLOR)
-    message = FONT.render("Play Action Screen - Under Construction", True, WHITE)
-    screen.blit(message, ((SCREEN_WIDTH - message.get_width())//2,
-                          (SCREEN_HEIGHT - message.get_height())//2))
+    snapshot = ENGINE.scoreboard.snapshot(limit=GAME_SCREEN_ROWS)
+    draw_team_scores(snapshot, "green", 50, GREEN)
+    draw_team_scores(snapshot, "red", SCREEN_WIDTH - 350, RED)
+
+    remaining = int(ENGINE.remaining(now) + 0.999)
+    center_x = SCREEN_WIDTH // 2
+    if ENGINE.state == COUNTDOWN and COUNTDOWN_ASSETS is not None and COUNTDOWN_ASSETS.has_frame(remaining):
+        frame = COUNTDOWN_ASSETS.frame_rects[remaining]
+        COUNTDOWN_ASSETS.blit_frame(screen, remaining, (center_x - frame.w // 2, 120))
+    else:
+        if ENGINE.state == COUNTDOWN:
+            label = f"Game starts in {remaining}"
+        elif ENGINE.state == PLAYING:
+            label = f"Time left {remaining // 60}:{remaining % 60:02d}"
+        else:
+            winner = snapshot["leader"]
+            label = f"{winner.capitalize()} team wins!" if winner else "It's a tie!"
+        text = render_text(label, WHITE)
+        screen.blit(text, (center_x - text.get_width() // 2, 160))
+
+    y = 300
+    for line in game_feed:
+        text = render_text(line, WHITE)
+        if text.get_width() > 300:
+            text = text.subsurface((0, 0, 300, text.get_height()))
+        screen.blit(text, (center_x - text.get_width() // 2, y))
+        y += 30
     return_button.draw(screen)
 
 return_button = Button((SCREEN_WIDTH - 200)//2, SCREEN_HEIGHT - 100, 200, 40, "Return", lambda: return_to_main())
 def return_to_main():
     """
-    Returns to the main state from the game screen.
+    Ends the game (if still running) and returns to the main state.
     """
-    global state
+    global state, game_receiver
+    ENGINE.stop(time.monotonic())
+    if game_receiver is not None:
+        game_receiver.close()
+        game_receiver = None
+    EVENT_LOG.close()
     state = "main"
     set_main_focus(0)
 
@@ -775,15 +1284,131 @@ def start_update_player():
     init_update_popup()
     state = "popup"
 
+# ---------------------------------------------------------
+# Splash Screen
+# ---------------------------------------------------------
+splash_shown_at = None
+time_to_interactive = None
+
+def update_splash():
+    """
+    Draws the splash screen (black until the logo has loaded, then the
+    logo) and returns True once it is time to go to the main screen.
+    """
+    global splash_image, splash_shown_at
+    now = time.perf_counter()
+    if splash_shown_at is None:
+        splash_shown_at = now
+        screen.fill(BG_COLOR)
+        pygame.display.flip()
+        print(f"Splash shown after {(now - STARTUP_TIME) * 1000:.0f} ms")
+    if splash_image is None and splash_future.done():
+        try:
+            splash_image = splash_future.result().convert()
+            screen.blit(splash_image, (0, 0))
+            pygame.display.flip()
+        except Exception as e:
+            print("Error loading splash image:", e)
+            splash_image = False
+    elapsed = now - splash_shown_at
+    warmed_up = splash_image is not None and db_init_future.done() and COUNTDOWN_ASSETS.done()
+    return elapsed >= SPLASH_MAX_SECONDS or (warmed_up and elapsed >= SPLASH_MIN_SECONDS)
+
+def leave_splash():
+    """
+    Moves from the splash (timed out or skipped with a key) to the main
+    screen, converting the preloaded countdown images now that the
+    display is up.
+    """
+    global state
+    COUNTDOWN_ASSETS.finalize()
+    state = "main"
+    set_main_focus(0)
+
+# ---------------------------------------------------------
+# Startup and Shutdown
+# ---------------------------------------------------------
+def init_app(headless=False, show_splash=True):
+    """
+    Opens the window (headless: an offscreen display through the SDL
+    dummy video driver) and starts loading the splash logo, the countdown
+    images and the database warmup in the background. Without the splash
+    the app starts on the main screen.
+    """
+    global screen, splash_future, COUNTDOWN_ASSETS, db_init_future, state
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Laser Tag - Player Entry")
+
+    # Load the logo on a background thread while the window opens; the
+    # thread ends once the image is loaded. asset_cache keeps the scaled
+    # pixels, so only the first launch (or one after logo.jpg changes)
+    # decodes the JPEG.
+    splash_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="splash-loader")
+    splash_future = splash_loader.submit(asset_cache.load_image, SPLASH_IMAGE_PATH, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    splash_loader.shutdown(wait=False)
+    COUNTDOWN_ASSETS = shared_bank()
+    _, db_init_future = DB_WORKER.submit("init", init_database)
+
+    if not show_splash:
+        leave_splash()
+
+def shutdown():
+    """
+    Prints the runtime stats and releases the database, UDP and pygame
+    resources.
+    """
+    print("Database pool stats:", DB_POOL.stats())
+    print("Codename cache stats:", CODENAME_CACHE.stats())
+    print("UDP sender stats:", UDP_SENDER.stats())
+    print("Text cache stats:", TEXT_CACHE.stats())
+    print("Frame stats:", FRAME_SCHEDULER.stats())
+    if game_receiver is not None:
+        game_receiver.close()
+    EVENT_LOG.close()
+    UDP_SENDER.close()
+    DB_WORKER.shutdown()
+    DB_POOL.closeall()
+    pygame.quit()
+
 # ---------------------------------------------------------
 # Main Event Loop
 # ---------------------------------------------------------
-while True:
+# What was drawn last frame; a different scene forces a full redraw.
+last_scene = None
+
+def current_scene():
+    return (state, popup_mode, popup_step, tuple(popup_rect) if popup_rect else None)
+
+def step(wait=True):
+    """
+    Runs one frame: handles the pending events and redraws what changed.
+    With wait=False it never sleeps waiting for input or to cap the frame
+    rate, so a script can post events and step as fast as possible.
+    Returns False once the application has quit.
+    """
+    global state, last_scene, time_to_interactive
+    # Animated states and scenes not drawn yet run at the full frame rate;
+    # otherwise block until something happens.
+    animating = not wait or state in ANIMATED_STATES or current_scene() != last_scene
+    events = FRAME_SCHEDULER.get_events(animating)
+    timed_out = state == "popup" and check_db_timeout()
+    if not events and not animating and not timed_out:
+        # Idle timeout with nothing new: there is nothing to redraw.
+        return True
+
     # Process events for the current state.
-    for event in pygame.event.get():
+    for event in events:
         if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
+            shutdown()
+            return False
+
+        if event.type == DB_RESULT:
+            handle_db_result(event)
+            continue
 
         if state == "main":
             # Handle keyboard shortcuts in the main screen.
@@ -795,7 +1420,16 @@ while True:
                     start_game()
                 if event.key == pygame.K_F12:
                     clear_players()
+                handle_table_key(event)
+            elif event.type == pygame.MOUSEWHEEL:
+                scroll_table_at(pygame.mouse.get_pos(), -event.y * 3)
             elif event.type == pygame.MOUSEBUTTONDOWN:
+                # A left click on a subheader changes that table's sort order
+                # (wheel "clicks" are buttons 4 and 5, and only scroll).
+                if event.button == 1:
+                    for team, subheader in subheader_rects().items():
+                        if subheader.collidepoint(event.pos):
+                            TEAM_VIEWS[team].cycle_sort()
                 # Check if the user clicked on any main button.
                 for i, widget in enumerate(main_widgets):
                     if widget.rect.collidepoint(event.pos):
@@ -807,6 +1441,12 @@ while True:
                 widget.handle_event(event)
 
         elif state == "popup":
+            # Input is ignored while the popup waits on the database,
+            # except Escape, which stops waiting.
+            if popup_pending_job is not None:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    cancel_db_job("Cancelled.")
+                continue
             # In popup state, handle focus switching and widget events.
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_TAB:
@@ -835,70 +1475,75 @@ while True:
         elif state == "splash":
             # If on the splash screen, any key press moves us to 'main'.
             if event.type == pygame.KEYDOWN:
-                state = "main"
+                leave_splash()
 
     # State-specific drawing/logic updates.
     if state == "splash":
-        # Display the splash image or a blank screen for 3 seconds, then go to main.
-        if splash_image:
-            screen.blit(splash_image, (0, 0))
-        else:
-            screen.fill(BG_COLOR)
-        pygame.display.flip()
-        pygame.time.delay(3000)
-        state = "main"
-        set_main_focus(0)
-        continue
+        # Show the splash while the logo and database warm up in the background.
+        if update_splash():
+            leave_splash()
+        FRAME_SCHEDULER.end_frame(cap=wait)
+        return True
+
+    # A change of screen (or popup step) needs a full redraw; otherwise
+    # only the regions that changed are redrawn and pushed to the display.
+    scene = current_scene()
+    full_redraw = scene != last_scene
+    last_scene = scene
 
     if state == "main":
-        draw_main_screen()
+        dirty_rects = draw_main_screen(full_redraw)
 
     elif state == "popup":
-        # Draw the main screen behind the popup (for a dim background effect).
-        draw_main_screen()
-        # Draw the popup area and its contents.
-        pygame.draw.rect(screen, STORMY_BLUE, popup_rect, border_radius=10)
-        pygame.draw.rect(screen, pygame.Color('black'), popup_rect, 2, border_radius=10)
-
-        # Decide the header text based on the mode and step (for add wizard).
-        header_text = ""
-        if popup_mode == "add":
-            if popup_step == 1:
-                header_text = "Step 1: Enter Player ID"
-            elif popup_step == 2:
-                header_text = "Step 2: Enter/Update Codename"
-            elif popup_step == 3:
-                header_text = "Step 3: Equipment ID & UDP IP"
-            elif popup_step == 4:
-                header_text = "Step 4: Choose Team"
-        elif popup_mode == "update":
-            header_text = "Update Player Information"
-
-        # Render and draw the popup header.
-        header_surf = FONT.render(header_text, True, WHITE)
-        screen.blit(header_surf, (popup_rect.x + 20, popup_rect.y + 20))
-
-        # If in update mode, label the first five widgets (the input boxes).
-        if popup_mode == "update":
-            labels = ["Player ID:", "Codename:", "Equipment ID:", "UDP Target IP:", "Team:"]
-            for i, widget in enumerate(popup_widgets[:5]):
-                label_surf = FONT.render(labels[i], True, WHITE)
-                # Position each label just above its input box.
-                label_y = widget.rect.y - label_surf.get_height() - 5
-                screen.blit(label_surf, (widget.rect.x, label_y))
-
-        # If there's an info/error message, draw it near the bottom of the popup.
-        if popup_info_text:
-            info_surf = FONT.render(popup_info_text, True, pygame.Color('red'))
-            screen.blit(info_surf, (popup_rect.x + 20, popup_rect.bottom - 40))
-
-        # Draw all widgets (inputs, buttons) in the popup.
-        for widget in popup_widgets:
-            widget.draw(screen)
+        # Draw the main screen behind the popup, then the popup on top
+        # (again if anything behind it was redrawn).
+        dirty_rects = draw_main_screen(full_redraw)
+        covered = full_redraw or popup_rect.collidelist(dirty_rects) != -1
+        dirty_rects += draw_popup(force=covered)
 
     elif state == "game":
+        update_game()
         draw_game_screen()
+        dirty_rects = None
 
-    # Update the display and maintain 30 FPS.
-    pygame.display.flip()
-    CLOCK.tick(30)
+    # Update the display and keep to at most 30 FPS.
+    if dirty_rects is None:
+        pygame.display.flip()
+    elif dirty_rects:
+        pygame.display.update(dirty_rects)
+    if time_to_interactive is None:
+        time_to_interactive = time.perf_counter() - STARTUP_TIME
+        print(f"Time to interactive: {time_to_interactive * 1000:.0f} ms")
+    FRAME_SCHEDULER.end_frame(cap=wait)
+    return True
+
+def run(max_frames=None):
+    """
+    Runs the event loop until the window is closed, or for max_frames
+    frames (without sleeping between them) and then shuts down.
+    """
+    frames = 0
+    while step(wait=max_frames is None):
+        frames += 1
+        if max_frames is not None and frames >= max_frames:
+            shutdown()
+            break
+
+def main(argv=None):
+    """
+    python3 main.py [--headless] [--frames N]
+    """
+    args = sys.argv[1:] if argv is None else argv
+    headless = "--headless" in args or os.environ.get(HEADLESS_ENV) == "1"
+    max_frames = None
+    if "--frames" in args:
+        try:
+            max_frames = int(args[args.index("--frames") + 1])
+        except (IndexError, ValueError):
+            print("Usage: python3 main.py [--headless] [--frames N]")
+            sys.exit(1)
+    init_app(headless=headless, show_splash=not headless)
+    run(max_frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+# ---------------------------------------------------------
+# Codename Cache
+# ---------------------------------------------------------
+class CodenameCache:
+    """
+    An in-process, read-through cache of player codenames keyed by
+    player ID. It is warmed with every known player at startup, keeps
+    the most recently used entries when it is full (LRU eviction) and
+    is updated whenever a player is written, so lookups for regulars
+    never touch the database. Safe to use from the database worker
+    thread and the render thread at the same time.
+    """
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, player_id):
+        """
+        Returns the cached codename for player_id, or None on a miss.
+        """
+        with self._lock:
+            codename = self._entries.get(player_id)
+            if codename is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(player_id)
+            self.hits += 1
+            return codename
+
+    def put(self, player_id, codename):
+        """
+        Stores (or refreshes) a codename, evicting the least recently
+        used entry if the cache is full.
+        """
+        with self._lock:
+            self._entries[player_id] = codename
+            self._entries.move_to_end(player_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def warm(self, conn):
+        """
+        Preloads the cache with one bulk query over the players table.
+        Returns the number of players loaded.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, codename FROM players;")
+        rows = cursor.fetchall()
+        cursor.close()
+        with self._lock:
+            for player_id, codename in rows[-self.maxsize:]:
+                if codename is not None:
+                    self._entries[player_id] = codename
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return len(rows)
+
+    def stats(self):
+        """
+        Returns the cache size and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+# ---------------------------------------------------------
+# Text Surface Cache
+# ---------------------------------------------------------
+class TextCache:
+    """
+    Caches rendered text surfaces keyed on (font, text, colour,
+    antialias), so text that does not change is rasterized once instead
+    of every frame. Holds at most `maxsize` surfaces and evicts the
+    least recently used one when full. Returned surfaces are shared:
+    blit them, but do not draw on them.
+    """
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Drop-in replacement for font.render(text, antialias, color).
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        surface = font.render(text, antialias, color)
+        self.renders += 1
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def stats(self):
+        """
+        Returns the number of cached surfaces, cache hits, real font.render
+        calls and the hit rate.
+        """
+        lookups = self.hits + self.renders
+        return {
+            "size": len(self._surfaces),
+            "hits": self.hits,
+            "renders": self.renders,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
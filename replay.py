@@ -0,0 +1,169 @@
+import sys
+import time
+from array import array
+
+from event_log import EventLogReader, IN
+from udp_client import UDPSender
+from udp_server import port_drops
+
+# ---------------------------------------------------------
+# Replay
+# ---------------------------------------------------------
+def _wait_until(due):
+    """
+    Sleeps until perf_counter() reaches `due`. time.sleep can overshoot
+    by a fraction of a millisecond, so the last stretch is spun.
+    """
+    while True:
+        left = due - time.perf_counter()
+        if left <= 0:
+            return
+        if left > 0.002:
+            time.sleep(left - 0.001)
+
+def schedule(records, speed=1.0, max_gap=None):
+    """
+    Yields (send offset in seconds, record) for each record. The gaps
+    between records are divided by `speed` (None sends everything at
+    once) and, if max_gap is given, any longer gap is cut to max_gap
+    seconds before the speed-up.
+    """
+    offset = 0.0
+    previous = None
+    for record in records:
+        if previous is not None and speed is not None:
+            gap = max(record.timestamp_ns - previous, 0) / 1e9
+            if max_gap is not None and gap > max_gap:
+                gap = max_gap
+            offset += gap / speed
+        previous = record.timestamp_ns
+        yield offset, record
+
+def replay(path, target_ip="127.0.0.1", port=7501, speed=1.0, max_gap=None, start=None, end=None,
+           progress=True):
+    """
+    Re-sends the inbound datagrams of a recorded game to target_ip:port,
+    keeping their original spacing divided by `speed` (None for as fast
+    as possible). start/end pick a window in seconds into the log.
+    Returns a stats dict: packets sent, send errors, elapsed time,
+    achieved and recorded rates, lag behind the schedule, and receiver
+    kernel drops when the target port is on this machine.
+    """
+    reader = EventLogReader(path)
+    sender = UDPSender()
+    lag = array("d")
+    errors = 0
+    sent = 0
+    first_ns = last_ns = None
+    # Receiver drops can only be read when the target is this machine.
+    local = target_ip == "localhost" or target_ip.startswith("127.")
+    drops_before = port_drops(port) if local else None
+    began = time.perf_counter()
+    next_report = began + 1.0
+    try:
+        for offset, record in schedule(reader.records(start, end, direction=IN), speed, max_gap):
+            if first_ns is None:
+                first_ns = record.timestamp_ns
+            last_ns = record.timestamp_ns
+            due = began + offset
+            if speed is not None:
+                _wait_until(due)
+            try:
+                sender.send(record.payload, target_ip, port)
+                sent += 1
+            except OSError:
+                errors += 1
+            now = time.perf_counter()
+            lag.append(now - due if speed is not None else 0.0)
+            if progress and now >= next_report:
+                print(f"{now - began:7.1f} s: {sent:,} sent, {sent / (now - began):,.0f} pkt/s, "
+                      f"lag {lag[-1] * 1000:.2f} ms")
+                next_report = now + 1.0
+    finally:
+        elapsed = time.perf_counter() - began
+        sender.close()
+        reader.close()
+
+    drops_after = port_drops(port) if local else None
+    recorded = (last_ns - first_ns) / 1e9 if first_ns is not None else 0.0
+    ordered = sorted(lag)
+    return {
+        "packets": sent,
+        "send_errors": errors,
+        "elapsed_s": elapsed,
+        "recorded_s": recorded,
+        "achieved_pps": sent / elapsed if elapsed > 0 else 0.0,
+        "recorded_pps": len(lag) / recorded if recorded > 0 else 0.0,
+        "lag_avg_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "lag_p99_ms": ordered[int(len(ordered) * 0.99)] * 1000 if ordered else 0.0,
+        "lag_max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "receiver_drops": (drops_after - drops_before
+                           if drops_before is not None and drops_after is not None else None),
+    }
+
+# ---------------------------------------------------------
+# Command Line
+# ---------------------------------------------------------
+def parse_speed(text):
+    """
+    "max" -> None (no pacing); "4", "4x" or "0.5x" -> the factor.
+    """
+    if text == "max":
+        return None
+    speed = float(text.rstrip("x"))
+    if speed <= 0:
+        raise ValueError("Speed must be greater than 0.")
+    return speed
+
+def main():
+    usage = ("Usage: python replay.py <log_file> [target_ip] [port] [--speed 1x|Nx|max] "
+             "[--max-gap seconds] [--from seconds] [--to seconds]")
+    options = {"--speed": "1", "--max-gap": None, "--from": None, "--to": None}
+    args = []
+    argv = sys.argv[1:]
+    i = 0
+    while i < len(argv):
+        if argv[i] in options and i + 1 < len(argv):
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            args.append(argv[i])
+            i += 1
+    if not 1 <= len(args) <= 3:
+        print(usage)
+        sys.exit(1)
+
+    try:
+        speed = parse_speed(options["--speed"])
+        max_gap, start, end = (float(options[name]) if options[name] is not None else None
+                               for name in ("--max-gap", "--from", "--to"))
+        target_ip = args[1] if len(args) > 1 else "127.0.0.1"
+        port = int(args[2]) if len(args) > 2 else 7501
+    except ValueError as e:
+        print(e)
+        print(usage)
+        sys.exit(1)
+
+    pace = "max speed" if speed is None else f"{speed:g}x"
+    print(f"Replaying {args[0]} to {target_ip}:{port} at {pace}")
+    try:
+        stats = replay(args[0], target_ip, port, speed, max_gap, start, end)
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("Replay stopped.")
+        sys.exit(1)
+
+    drops = stats["receiver_drops"]
+    print(f"Sent {stats['packets']:,} datagrams in {stats['elapsed_s']:.3f} s "
+          f"({stats['recorded_s']:.3f} s recorded): {stats['achieved_pps']:,.0f} pkt/s achieved, "
+          f"{stats['recorded_pps']:,.0f} pkt/s recorded")
+    print(f"Send errors {stats['send_errors']:,}, receiver kernel drops "
+          f"{'n/a' if drops is None else f'{drops:,}'}")
+    if speed is not None:
+        print(f"Lag behind schedule: avg {stats['lag_avg_ms']:.3f} ms, "
+              f"p99 {stats['lag_p99_ms']:.3f} ms, max {stats['lag_max_ms']:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from itertools import islice
+
+TEAMS = ("green", "red")
+
+class Player:
+    """
+    One player on the roster. Uses __slots__ so hundreds of players
+    stay small and attribute access stays fast.
+    """
+    __slots__ = ("player_id", "codename", "equipment", "team")
+
+    def __init__(self, player_id, codename, equipment, team):
+        self.player_id = player_id
+        self.codename = codename
+        self.equipment = equipment
+        self.team = team
+
+    def __repr__(self):
+        return f"Player({self.player_id}, {self.codename!r}, {self.equipment}, {self.team!r})"
+
+class Roster:
+    """
+    The players in the current game, indexed by player ID and by
+    equipment ID. Each team keeps its players in the order they joined
+    (a dict keyed by player ID), so adding, moving and removing a player
+    are all O(1) and resolving a hit's equipment ID is one dict lookup.
+    """
+    def __init__(self):
+        self.by_id = {}
+        self.by_equipment = {}
+        self.teams = {team: {} for team in TEAMS}
+        # Bumped on every change so views can tell when to refresh.
+        self.version = 0
+
+    def add(self, player_id, codename, equipment, team):
+        """
+        Adds a player, or updates one already on the roster. A player who
+        stays on the same team keeps their place; a team change moves them
+        to the end of the new team. If another player held this equipment
+        ID, they lose it (their equipment becomes None).
+        """
+        if team not in self.teams:
+            raise ValueError(f"Unknown team {team!r}")
+        player = self.by_id.get(player_id)
+        if player is None:
+            player = Player(player_id, codename, None, team)
+            self.by_id[player_id] = player
+            self.teams[team][player_id] = player
+        else:
+            player.codename = codename
+            if player.team != team:
+                del self.teams[player.team][player_id]
+                self.teams[team][player_id] = player
+                player.team = team
+        self._assign_equipment(player, equipment)
+        self.version += 1
+        return player
+
+    def _assign_equipment(self, player, equipment):
+        if player.equipment == equipment:
+            return
+        if player.equipment is not None:
+            self.by_equipment.pop(player.equipment, None)
+        if equipment is not None:
+            previous = self.by_equipment.get(equipment)
+            if previous is not None:
+                previous.equipment = None
+            self.by_equipment[equipment] = player
+        player.equipment = equipment
+
+    def move(self, player_id, team):
+        """
+        Moves a player to the end of another team.
+        """
+        player = self.by_id[player_id]
+        if player.team != team:
+            del self.teams[player.team][player_id]
+            self.teams[team][player_id] = player
+            player.team = team
+            self.version += 1
+        return player
+
+    def remove(self, player_id):
+        """
+        Removes a player. Returns the removed Player, or None.
+        """
+        player = self.by_id.pop(player_id, None)
+        if player is None:
+            return None
+        del self.teams[player.team][player_id]
+        if player.equipment is not None:
+            self.by_equipment.pop(player.equipment, None)
+        self.version += 1
+        return player
+
+    def get(self, player_id):
+        return self.by_id.get(player_id)
+
+    def for_equipment(self, equipment):
+        """
+        Returns the Player using an equipment ID, or None.
+        """
+        return self.by_equipment.get(equipment)
+
+    def team_players(self, team, limit=None):
+        """
+        Returns the players of a team in join order, optionally only the
+        first `limit` of them.
+        """
+        players = self.teams[team].values()
+        if limit is None:
+            return list(players)
+        return list(islice(players, limit))
+
+    def team_size(self, team):
+        return len(self.teams[team])
+
+    def clear(self):
+        self.by_id.clear()
+        self.by_equipment.clear()
+        for players in self.teams.values():
+            players.clear()
+        self.version += 1
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, player_id):
+        return player_id in self.by_id
@@ -0,0 +1,107 @@
+# ---------------------------------------------------------
+# Virtualized Team Table View
+# ---------------------------------------------------------
+# Sort orders, in the order cycle_sort() steps through them.
+SORT_ORDERS = ("joined", "codename", "id")
+
+class RosterView:
+    """
+    A scrollable, sortable and searchable window onto one team of a
+    Roster. The filtered, sorted row list is rebuilt only when the roster
+    (its version), the sort order or the search text changes. Each frame
+    reads just the `visible_rows` rows in the window, so drawing costs
+    the same for 10 players or 1,000.
+
+    The search matches codenames containing the text (ignoring case) and
+    player IDs starting with it. Typing more characters filters the
+    previous matches instead of the whole team.
+    """
+    def __init__(self, roster, team, visible_rows=10):
+        self.roster = roster
+        self.team = team
+        self.visible_rows = visible_rows
+        self.sort = SORT_ORDERS[0]
+        self.query = ""
+        self.first = 0           # index of the first visible row
+        self._rows = []
+        self._built_for = None   # (roster version, sort, query) of _rows
+        self.rebuilds = 0
+
+    @staticmethod
+    def _matches(player, query):
+        return query in player.codename.casefold() or str(player.player_id).startswith(query)
+
+    def _refresh(self):
+        key = (self.roster.version, self.sort, self.query)
+        if key == self._built_for:
+            return
+        query = self.query.casefold()
+        previous = self._built_for
+        if (previous is not None and previous[:2] == key[:2]
+                and query.startswith(previous[2].casefold())):
+            # Narrowing the search: the old matches, in order, are a superset.
+            rows = [p for p in self._rows if self._matches(p, query)]
+        else:
+            rows = self.roster.team_players(self.team)
+            if query:
+                rows = [p for p in rows if self._matches(p, query)]
+            if self.sort == "codename":
+                rows.sort(key=lambda p: p.codename.casefold())
+            elif self.sort == "id":
+                rows.sort(key=lambda p: p.player_id)
+        self._rows = rows
+        self._built_for = key
+        self.rebuilds += 1
+        self.first = self._clamp(self.first)
+
+    def _clamp(self, first):
+        return max(0, min(first, len(self._rows) - self.visible_rows))
+
+    def __len__(self):
+        self._refresh()
+        return len(self._rows)
+
+    def window(self):
+        """
+        Returns the visible rows as a list of (row index, Player), at most
+        visible_rows long.
+        """
+        self._refresh()
+        end = min(self.first + self.visible_rows, len(self._rows))
+        return [(i, self._rows[i]) for i in range(self.first, end)]
+
+    def scroll(self, rows):
+        """
+        Scrolls by a number of rows (negative scrolls up).
+        """
+        self._refresh()
+        self.first = self._clamp(self.first + rows)
+
+    def page(self, pages):
+        self.scroll(pages * self.visible_rows)
+
+    def scroll_to(self, index):
+        """
+        Scrolls so row `index` is the first visible one (or as close as
+        the list allows). Negative indexes count from the end.
+        """
+        self._refresh()
+        if index < 0:
+            index += len(self._rows)
+        self.first = self._clamp(index)
+
+    def set_query(self, query):
+        """
+        Sets the search text and jumps back to the top of the results.
+        """
+        if query != self.query:
+            self.query = query
+            self.first = 0
+
+    def cycle_sort(self):
+        """
+        Switches to the next sort order. Returns it.
+        """
+        self.sort = SORT_ORDERS[(SORT_ORDERS.index(self.sort) + 1) % len(SORT_ORDERS)]
+        self.first = 0
+        return self.sort
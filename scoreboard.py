@@ -0,0 +1,158 @@
+from bisect import bisect_left, insort
+
+from roster import TEAMS
+
+# ---------------------------------------------------------
+# Incremental Scoreboard
+# ---------------------------------------------------------
+class Scoreboard:
+    """
+    Player scores, team totals and the ranked order of each team, kept
+    current one hit at a time. Each team groups its players into buckets
+    by score (score -> players at that score, in the order they reached
+    it) plus a bisect-sorted list of the distinct scores, so a score
+    change moves one player between two buckets instead of re-sorting the
+    roster, and reading the top N touches only N players.
+
+    snapshot() returns an immutable view for rendering that is rebuilt
+    only after the scores change.
+    """
+    def __init__(self, teams=TEAMS):
+        self.teams = tuple(teams)
+        self.reset()
+
+    def reset(self):
+        """
+        Removes every player and zeroes the totals.
+        """
+        self.scores = {}      # player ID -> score
+        self.team_of = {}     # player ID -> team
+        self.totals = {team: 0 for team in self.teams}
+        self._buckets = {team: {} for team in self.teams}   # team -> {score: {player ID: None}}
+        self._levels = {team: [] for team in self.teams}    # team -> distinct scores, ascending
+        self.version = 0
+        self._snapshot = None
+        self._snapshot_key = None
+
+    def _enter(self, team, player_id, score):
+        bucket = self._buckets[team].get(score)
+        if bucket is None:
+            bucket = self._buckets[team][score] = {}
+            insort(self._levels[team], score)
+        bucket[player_id] = None
+
+    def _leave(self, team, player_id, score):
+        bucket = self._buckets[team][score]
+        del bucket[player_id]
+        if not bucket:
+            del self._buckets[team][score]
+            levels = self._levels[team]
+            del levels[bisect_left(levels, score)]
+
+    def add_player(self, player_id, team, score=0):
+        """
+        Adds a player (or moves them to `team`, keeping their score).
+        """
+        if player_id in self.scores:
+            self.move_player(player_id, team)
+            return
+        self.scores[player_id] = score
+        self.team_of[player_id] = team
+        self.totals[team] += score
+        self._enter(team, player_id, score)
+        self.version += 1
+
+    def move_player(self, player_id, team):
+        old_team = self.team_of[player_id]
+        if old_team == team:
+            return
+        score = self.scores[player_id]
+        self._leave(old_team, player_id, score)
+        self.totals[old_team] -= score
+        self._enter(team, player_id, score)
+        self.totals[team] += score
+        self.team_of[player_id] = team
+        self.version += 1
+
+    def remove_player(self, player_id):
+        team = self.team_of.pop(player_id, None)
+        if team is None:
+            return
+        score = self.scores.pop(player_id)
+        self._leave(team, player_id, score)
+        self.totals[team] -= score
+        self.version += 1
+
+    def add(self, player_id, points, team=None):
+        """
+        Adds points (may be negative) to a player's score and their team
+        total. A player not on the board yet is added to `team` first.
+        Returns the new score.
+        """
+        old = self.scores.get(player_id)
+        if old is None:
+            self.add_player(player_id, team)
+            old = 0
+        team = self.team_of[player_id]
+        new = old + points
+        if points:
+            self._leave(team, player_id, old)
+            self._enter(team, player_id, new)
+            self.scores[player_id] = new
+            self.totals[team] += points
+            self.version += 1
+        return new
+
+    def score(self, player_id):
+        return self.scores.get(player_id, 0)
+
+    def ranked(self, team, limit=None):
+        """
+        Yields (player ID, score) for a team, highest score first. Players
+        on the same score are listed in the order they reached it.
+        """
+        buckets = self._buckets[team]
+        count = 0
+        for score in reversed(self._levels[team]):
+            for player_id in buckets[score]:
+                if limit is not None and count >= limit:
+                    return
+                yield player_id, score
+                count += 1
+
+    def rank(self, player_id):
+        """
+        Returns a player's 1-based rank on their team (players on the same
+        score share a rank).
+        """
+        team = self.team_of[player_id]
+        score = self.scores[player_id]
+        levels = self._levels[team]
+        buckets = self._buckets[team]
+        ahead = sum(len(buckets[s]) for s in levels[bisect_left(levels, score) + 1:])
+        return ahead + 1
+
+    def leading_team(self):
+        """
+        Returns the team with the highest total, or None on a tie.
+        """
+        best = max(self.totals.values())
+        leaders = [team for team, total in self.totals.items() if total == best]
+        return leaders[0] if len(leaders) == 1 else None
+
+    def snapshot(self, limit=None):
+        """
+        Returns {"version", "totals", "leader", "ranked": {team: ((player
+        ID, score), ...)}} for the top `limit` players of each team. The
+        same object is returned until the scores change.
+        """
+        key = (self.version, limit)
+        if self._snapshot_key != key:
+            self._snapshot = {
+                "version": self.version,
+                "totals": dict(self.totals),
+                "leader": self.leading_team(),
+                "ranked": {team: tuple(self.ranked(team, limit)) for team in self.teams},
+            }
+            self._snapshot_key = key
+        return self._snapshot
@@ -0,0 +1,62 @@
+import psycopg2
+import pytest
+
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout
+
+class FakeConnection:
+    closed = 0
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+@pytest.fixture
+def connects(monkeypatch):
+    """Replaces psycopg2.connect; append an exception to make the next connect fail."""
+    failures = []
+    def connect(**kwargs):
+        if failures:
+            raise failures.pop()
+        return FakeConnection()
+    monkeypatch.setattr(db_pool.psycopg2, "connect", connect)
+    return failures
+
+def test_connections_are_reused(connects):
+    pool = ConnectionPool(maxconn=1)
+    first = pool.getconn()
+    pool.putconn(first)
+    assert pool.getconn() is first
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["reused"], stats["created"], stats["hit_rate"]) == (2, 1, 1, 0.5)
+
+def test_failed_connect_is_counted_separately(connects):
+    pool = ConnectionPool(maxconn=1)
+    connects.append(psycopg2.OperationalError("down"))
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["failed_checkouts"], stats["connect_failures"]) == (0, 1, 1)
+    assert stats["in_use"] == 0
+    assert stats["wait_avg_ms"] == 0.0
+    # The slot was released, so the next checkout connects.
+    pool.getconn()
+    assert pool.stats()["checkouts"] == 1
+
+def test_timeout_when_pool_is_full(connects):
+    pool = ConnectionPool(maxconn=1)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.01)
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["failed_checkouts"], stats["in_use"]) == (1, 1, 1)
+
+def test_broken_connections_are_discarded(connects):
+    pool = ConnectionPool(maxconn=1)
+    conn = pool.getconn()
+    pool.putconn(conn, broken=True)
+    assert conn.closed
+    assert pool.getconn() is not conn
+    assert pool.stats()["discarded"] == 1
@@ -0,0 +1,105 @@
+import pytest
+
+from game_engine import (GameEngine, SETUP, COUNTDOWN, PLAYING, ENDED, START_CODE, END_CODE,
+                         TAG_POINTS, BASE_POINTS, GREEN_BASE, RED_BASE)
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(countdown=30, duration=360)
+    engine.roster.add(1, "Alpha", 11, "green")
+    engine.roster.add(2, "Bravo", 12, "red")
+    engine.roster.add(3, "Charlie", 13, "green")
+    engine.updates = []
+    engine.subscribe(engine.updates.append)
+    return engine
+
+def replies(engine):
+    return [update.reply for update in engine.updates if update.kind == "state"]
+
+# ---------------------------------------------------------
+# State Machine
+# ---------------------------------------------------------
+def test_full_game_sends_start_and_end_codes(engine):
+    assert engine.state == SETUP
+    engine.start(0.0)
+    assert engine.state == COUNTDOWN
+    assert engine.remaining(10.0) == 20.0
+    engine.tick(30.0)
+    assert engine.state == PLAYING
+    engine.tick(390.0)
+    assert engine.state == ENDED
+    assert replies(engine) == [None, [START_CODE], [END_CODE] * 3]
+
+def test_tick_can_skip_straight_to_ended(engine):
+    engine.start(0.0)
+    engine.tick(1000.0)
+    assert engine.state == ENDED
+    assert replies(engine) == [None, [START_CODE], [END_CODE] * 3]
+
+def test_stop_during_countdown_sends_nothing(engine):
+    engine.start(0.0)
+    engine.stop(5.0)
+    assert engine.state == ENDED
+    assert replies(engine) == [None, None]
+    assert engine.remaining(6.0) == 0.0
+
+def test_stop_while_playing_sends_end_code(engine):
+    engine.start(0.0)
+    engine.tick(40.0)
+    engine.stop(50.0)
+    assert engine.state == ENDED
+    assert replies(engine) == [None, [START_CODE], [END_CODE] * 3]
+
+def test_stop_outside_a_game_does_nothing(engine):
+    engine.stop(0.0)
+    assert engine.state == SETUP
+    assert engine.updates == []
+
+def test_start_is_ignored_while_running(engine):
+    engine.start(0.0)
+    engine.start(10.0)
+    assert engine.started_at == 0.0
+    assert replies(engine) == [None]
+
+def test_restart_clears_scores(engine):
+    engine.start(0.0)
+    engine.hit(40.0, 11, 12)
+    engine.stop(50.0)
+    engine.start(60.0)
+    assert engine.state == COUNTDOWN
+    assert engine.scores == {1: 0, 2: 0, 3: 0}
+
+# ---------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------
+def test_hits_only_score_while_playing(engine):
+    engine.start(0.0)
+    assert engine.hit(10.0, 11, 12) is None
+    assert engine.hit(40.0, 11, 12).reply == 12
+    engine.stop(50.0)
+    assert engine.hit(60.0, 11, 12) is None
+    assert engine.scores[1] == TAG_POINTS
+    assert engine.ignored == 2
+
+def test_friendly_fire_costs_both_players(engine):
+    engine.start(0.0)
+    update = engine.hit(40.0, 11, 13)
+    assert update.kind == "friendly_fire"
+    assert update.reply == 11
+    assert engine.scores[1] == engine.scores[3] == -TAG_POINTS
+    assert engine.team_scores == {"green": -2 * TAG_POINTS, "red": 0}
+
+def test_base_hits(engine):
+    engine.start(0.0)
+    assert engine.hit(40.0, 11, GREEN_BASE) is None
+    assert engine.hit(41.0, 11, RED_BASE).kind == "base"
+    assert engine.scores[1] == BASE_POINTS
+    assert engine.base_hits == {1}
+
+def test_unknown_and_malformed_messages_are_ignored(engine):
+    engine.start(0.0)
+    assert engine.hit(40.0, 99, 12) is None
+    assert engine.hit(40.0, 11, 11) is None
+    assert engine.handle_message(40.0, b"garbage") is None
+    assert engine.handle_message(40.0, b"12:11").kind == "tag"
+    assert engine.leading_team() == "red"
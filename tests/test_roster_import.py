@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+from database import parse_player_id, read_roster_chunks, PLAYER_ID_MAX
+
+def read_all(text, chunk_size=100):
+    rows, skipped = [], 0
+    for chunk, chunk_skipped in read_roster_chunks(io.StringIO(text), chunk_size):
+        rows += chunk
+        skipped += chunk_skipped
+    return rows, skipped
+
+# ---------------------------------------------------------
+# Player IDs
+# ---------------------------------------------------------
+def test_parse_player_id_bounds():
+    assert parse_player_id("0") == 0
+    assert parse_player_id(str(PLAYER_ID_MAX)) == PLAYER_ID_MAX
+    assert parse_player_id(str(PLAYER_ID_MAX + 1)) is None
+
+@pytest.mark.parametrize("text", ["", "-1", "+1", "1.5", " 1", "abc", "²", "١", "１"])
+def test_parse_player_id_rejects_non_ascii_numbers(text):
+    assert parse_player_id(text) is None
+
+# ---------------------------------------------------------
+# read_roster_chunks
+# ---------------------------------------------------------
+def test_reads_rows_and_skips_header():
+    assert read_all("id,codename\n1,Ace\n2, Bolt \n") == ([(1, "Ace"), (2, "Bolt")], 0)
+
+def test_later_rows_win():
+    assert read_all("1,Ace\n1,Ace2\n") == ([(1, "Ace2")], 0)
+
+@pytest.mark.parametrize("line", ["²,Sup", "99999999999,Big", "-3,Neg", "x,Word", "4", "5,", "6," + "x" * 31])
+def test_rejects_bad_rows(line, capsys):
+    rows, skipped = read_all("1,Ace\n" + line + "\n")
+    assert rows == [(1, "Ace")]
+    assert skipped == 1
+    assert "Skipping line 2" in capsys.readouterr().out
+
+def test_out_of_range_first_line_is_not_a_header():
+    assert read_all("99999999999,Big\n") == ([], 1)
+
+def test_chunks():
+    text = "".join(f"{i},P{i}\n" for i in range(5))
+    chunks = list(read_roster_chunks(io.StringIO(text), 2))
+    assert [len(rows) for rows, _ in chunks] == [2, 2, 1]
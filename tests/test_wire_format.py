@@ -0,0 +1,67 @@
+import struct
+
+import pytest
+
+import wire_format
+from udp_client import to_binary
+
+# ---------------------------------------------------------
+# Binary Records
+# ---------------------------------------------------------
+@pytest.mark.parametrize("msg_type", [wire_format.HIT, wire_format.EQUIPMENT, wire_format.CONTROL, wire_format.ACK])
+def test_binary_round_trip(msg_type):
+    data = wire_format.encode(msg_type, 12, 34, 56)
+    assert len(data) == wire_format.BINARY_SIZE
+    assert wire_format.is_binary(data)
+    assert wire_format.decode(data) == wire_format.Message(msg_type, 12, 34, 56)
+
+def test_field_bounds_round_trip():
+    data = wire_format.encode_hit(0xFFFF, 0, 0xFFFFFFFF)
+    assert wire_format.decode_binary(data) == wire_format.Message(wire_format.HIT, 0xFFFF, 0, 0xFFFFFFFF)
+
+def test_sequence_number_wraps():
+    assert wire_format.decode_binary(wire_format.encode_ack(2**32 + 5)).seq == 5
+
+@pytest.mark.parametrize("shooter, target", [(0x10000, 0), (-1, 0), (1, 0x10000), (1, -1)])
+def test_encode_rejects_out_of_range_ids(shooter, target):
+    with pytest.raises(struct.error):
+        wire_format.encode(wire_format.HIT, shooter, target)
+
+def test_encode_into_matches_encode():
+    buffer = bytearray(2 * wire_format.BINARY_SIZE)
+    offset = wire_format.encode_into(buffer, 0, wire_format.HIT, 1, 2, 3)
+    assert wire_format.encode_into(buffer, offset, wire_format.CONTROL, 202) == len(buffer)
+    assert bytes(buffer) == wire_format.encode_hit(1, 2, 3) + wire_format.encode_control(202)
+
+def test_decode_binary_rejects_short_and_unknown_records():
+    data = wire_format.encode_hit(1, 2)
+    assert wire_format.decode_binary(data[:-1]) is None
+    assert wire_format.decode_binary(b"\x82" + data[1:]) is None
+
+# ---------------------------------------------------------
+# Text Messages
+# ---------------------------------------------------------
+def test_text_messages():
+    assert wire_format.decode(b"11:12") == wire_format.Message(wire_format.HIT, 11, 12, None)
+    assert wire_format.decode(b"202") == wire_format.Message(wire_format.EQUIPMENT, 202, 0, None)
+    assert wire_format.decode(b"11:x") is None
+    assert wire_format.decode(b"") is None
+    assert wire_format.encode_text(wire_format.Message(wire_format.HIT, 11, 12, None)) == b"11:12"
+
+def test_parse_hit_reads_both_formats():
+    assert wire_format.parse_hit(b"11:12") == (11, 12)
+    assert wire_format.parse_hit(memoryview(wire_format.encode_hit(11, 12))) == (11, 12)
+    assert wire_format.parse_hit(wire_format.encode_control(221)) is None
+    assert wire_format.parse_hit(b"221") is None
+
+# ---------------------------------------------------------
+# udp_client.to_binary
+# ---------------------------------------------------------
+def test_to_binary():
+    assert to_binary("11:12", seq=7) == wire_format.encode_hit(11, 12, 7)
+    assert to_binary("65535") == wire_format.encode_equipment(65535)
+
+@pytest.mark.parametrize("message", ["70000", "-5", "3:70000", "hello"])
+def test_to_binary_rejects_unencodable_messages(message):
+    with pytest.raises(ValueError):
+        to_binary(message)
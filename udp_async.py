@@ -0,0 +1,252 @@
+import asyncio
+import socket
+import sys
+import time
+from collections import namedtuple
+
+import wire_format
+from udp_client import BROADCAST_IP
+
+# One received datagram: decoded message, sender address, the local port
+# it arrived on (so many arenas can share one queue) and a monotonic timestamp.
+UDPEvent = namedtuple("UDPEvent", ["message", "addr", "port", "received_at"])
+
+def decode_text(data):
+    """Text-only decoder: UTF-8 text, as sent by udp_client.py and main.py."""
+    return data.decode("utf-8", errors="replace")
+
+def decode_message(data):
+    """
+    Default decoder. Binary records (told apart by their first byte, as
+    in udp_server.py) become a wire_format.Message, or None if malformed;
+    anything else is decoded as UTF-8 text.
+    """
+    if wire_format.is_binary(data):
+        return wire_format.decode_binary(data)
+    return decode_text(data)
+
+# ---------------------------------------------------------
+# Server
+# ---------------------------------------------------------
+class ServerProtocol(asyncio.DatagramProtocol):
+    """
+    asyncio datagram protocol that decodes each datagram and puts a
+    UDPEvent on a bounded queue. When the queue fills up, reading from
+    the socket is paused so the kernel buffer absorbs the burst instead
+    of the event loop; the owning AsyncUDPServer resumes it once
+    consumers catch up. If the transport cannot pause, events are
+    dropped and counted instead.
+    """
+    def __init__(self, server, port):
+        self.server = server
+        self.port = port
+
+    def datagram_received(self, data, addr):
+        server = self.server
+        event = UDPEvent(server.decode(data), addr, self.port, time.monotonic())
+        try:
+            server.queue.put_nowait(event)
+            server.received += 1
+        except asyncio.QueueFull:
+            server.dropped += 1
+        if server.queue.full():
+            server._pause()
+
+    def error_received(self, exc):
+        self.server.errors += 1
+
+class AsyncUDPServer:
+    """
+    Receives UDP traffic on one or more ports into a single bounded
+    asyncio queue. Consumers call `await server.get()`; reading resumes
+    once the queue drains below the low-water mark.
+    """
+    def __init__(self, maxsize=10000, decode=decode_message, low_water=None, rcvbuf=4 * 1024 * 1024):
+        self.queue = asyncio.Queue(maxsize)
+        self.decode = decode
+        self.rcvbuf = rcvbuf
+        self.low_water = low_water if low_water is not None else maxsize // 2
+        self.transports = []
+        # Transports whose reading is currently paused.
+        self._paused = []
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.pauses = 0
+
+    async def listen(self, local_ip="0.0.0.0", port=7501):
+        """
+        Binds another port. Returns the bound (ip, port).
+        """
+        # A large kernel buffer holds the backlog while reading is paused.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            sock.bind((local_ip, port))
+            bound = sock.getsockname()
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: ServerProtocol(self, bound[1]), sock=sock
+            )
+        except BaseException:
+            sock.close()
+            raise
+        self.transports.append(transport)
+        if self._paused and self._pause_transport(transport):
+            self._paused.append(transport)
+        return bound
+
+    @staticmethod
+    def _pause_transport(transport):
+        try:
+            transport.pause_reading()
+            return True
+        except (AttributeError, NotImplementedError):
+            return False
+
+    def _pause(self):
+        # All ports feed one queue, so they are paused and resumed together.
+        # A transport that cannot pause keeps reading (and dropping when
+        # full); only the ones that did pause are resumed later.
+        if self._paused:
+            return
+        self._paused = [transport for transport in self.transports if self._pause_transport(transport)]
+        if self._paused:
+            self.pauses += 1
+
+    def _maybe_resume(self):
+        if self._paused and self.queue.qsize() <= self.low_water:
+            for transport in self._paused:
+                if not transport.is_closing():
+                    transport.resume_reading()
+            self._paused = []
+
+    async def get(self):
+        """
+        Waits for and returns the next UDPEvent.
+        """
+        event = await self.queue.get()
+        self._maybe_resume()
+        return event
+
+    def get_nowait(self):
+        """
+        Returns the next UDPEvent or raises asyncio.QueueEmpty.
+        """
+        event = self.queue.get_nowait()
+        self._maybe_resume()
+        return event
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "pauses": self.pauses,
+            "queued": self.queue.qsize(),
+        }
+
+    def close(self):
+        for transport in self.transports:
+            transport.close()
+        self.transports.clear()
+        self._paused = []
+
+async def start_server(local_ip="0.0.0.0", ports=(7501,), maxsize=10000, decode=decode_message):
+    """
+    Creates an AsyncUDPServer listening on every port in `ports`.
+    """
+    server = AsyncUDPServer(maxsize, decode=decode)
+    for port in ports:
+        await server.listen(local_ip, port)
+    return server
+
+# ---------------------------------------------------------
+# Client
+# ---------------------------------------------------------
+class ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client):
+        self.client = client
+
+    def error_received(self, exc):
+        self.client.errors += 1
+
+class AsyncUDPClient:
+    """
+    Sends UDP messages from inside an event loop. send() hands the
+    datagram to the transport and returns at once; it never blocks.
+    One endpoint is kept per destination.
+    """
+    def __init__(self):
+        self._transports = {}
+        self.packets = 0
+        self.errors = 0
+
+    async def connect(self, target_ip, port=7501):
+        """
+        Opens (or reuses) the endpoint for target_ip:port.
+        """
+        key = (target_ip, port)
+        transport = self._transports.get(key)
+        if transport is None or transport.is_closing():
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: ClientProtocol(self), remote_addr=key,
+                allow_broadcast=target_ip == BROADCAST_IP
+            )
+            self._transports[key] = transport
+        return transport
+
+    async def send(self, message, target_ip, port=7501):
+        """
+        Sends one message (str, int or bytes) without blocking the loop.
+        """
+        transport = self._transports.get((target_ip, port))
+        if transport is None or transport.is_closing():
+            transport = await self.connect(target_ip, port)
+        data = message if isinstance(message, (bytes, bytearray)) else str(message).encode()
+        transport.sendto(data)
+        self.packets += 1
+
+    def close(self):
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
+
+# ---------------------------------------------------------
+# Command Line
+# ---------------------------------------------------------
+async def serve(local_ip, ports):
+    """
+    Prints every message received on the given ports.
+    """
+    server = await start_server(local_ip, ports)
+    print(f"Async UDP server listening on {local_ip} ports {', '.join(map(str, ports))}")
+    try:
+        while True:
+            event = await server.get()
+            if isinstance(event.message, str):
+                print(f"Received message '{event.message}' from {event.addr} on port {event.port}")
+            else:
+                print(f"Received binary message {event.message} from {event.addr} on port {event.port}")
+    finally:
+        server.close()
+
+def main():
+    local_ip = "0.0.0.0"
+    ports = [7501]
+    if len(sys.argv) > 1:
+        local_ip = sys.argv[1]
+    if len(sys.argv) > 2:
+        try:
+            ports = [int(port) for port in sys.argv[2:]]
+        except ValueError:
+            print("Ports must be integers.")
+            sys.exit(1)
+    try:
+        asyncio.run(serve(local_ip, ports))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,475 @@
+import heapq
+import math
+import multiprocessing
+import queue
+import random
+import selectors
 import socket
 import sys
+import time
+from array import array
+from collections import OrderedDict
+
+import wire_format
+from event_log import OUT
+from udp_server import port_drops
+
+BROADCAST_IP = "255.255.255.255"
+
+class UDPSender:
+    """
+    Long-lived UDP sender. Keeps one connected socket open per destination
+    (and broadcast mode) and reuses it, so each message costs a single
+    send() call instead of creating, configuring and closing a socket.
+    Counts packets, bytes and errors. With a `log` (an event_log.EventLog),
+    every datagram sent is also appended to it.
+    """
+    def __init__(self, max_sockets=32, log=None):
+        self.max_sockets = max_sockets
+        self.log = log
+        self._sockets = OrderedDict()  # (ip, port, broadcast) -> socket
+        self.packets = 0
+        self.bytes = 0
+        self.errors = 0
+        self.refused = 0
+        self.sockets_opened = 0
+
+    def _socket_for(self, target_ip, port):
+        """
+        Returns the cached socket for a destination, opening and connecting
+        a new one (with SO_BROADCAST for the broadcast address) if needed.
+        """
+        key = (target_ip, port, target_ip == BROADCAST_IP)
+        sock = self._sockets.get(key)
+        if sock is not None:
+            self._sockets.move_to_end(key)
+            return sock
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            if key[2]:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.connect((target_ip, port))
+        except OSError:
+            sock.close()
+            raise
+        self._sockets[key] = sock
+        self.sockets_opened += 1
+        # Close the least recently used socket if too many destinations are open.
+        while len(self._sockets) > self.max_sockets:
+            _, old_sock = self._sockets.popitem(last=False)
+            old_sock.close()
+        return sock
+
+    @staticmethod
+    def _to_bytes(message):
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            return message
+        return str(message).encode()
+
+    def _send(self, sock, data, addr):
+        try:
+            sock.send(data)
+        except ConnectionRefusedError:
+            # An earlier datagram to this destination bounced (nothing was
+            # listening). Linux reports that on this call without sending,
+            # so send once more.
+            self.refused += 1
+            sock.send(data)
+        self.packets += 1
+        self.bytes += len(data)
+        if self.log is not None:
+            self.log.append(OUT, data, addr)
+
+    def send(self, message, target_ip, port=7501):
+        """
+        Sends one message (str, int or bytes) to target_ip:port.
+        Raises OSError if the send fails.
+        """
+        try:
+            self._send(self._socket_for(target_ip, port), self._to_bytes(message), (target_ip, port))
+        except OSError:
+            self.errors += 1
+            self.close_destination(target_ip, port)
+            raise
+
+    def send_many(self, messages, target_ip, port=7501):
+        """
+        Sends a batch of messages to one destination over the same socket.
+        Returns the number sent; raises OSError on the first failure.
+        """
+        sent = 0
+        try:
+            sock = self._socket_for(target_ip, port)
+            addr = (target_ip, port)
+            for message in messages:
+                self._send(sock, self._to_bytes(message), addr)
+                sent += 1
+        except OSError:
+            self.errors += 1
+            self.close_destination(target_ip, port)
+            raise
+        return sent
+
+    def close_destination(self, target_ip, port):
+        """
+        Closes the cached socket for one destination (it is reopened on
+        the next send).
+        """
+        sock = self._sockets.pop((target_ip, port, target_ip == BROADCAST_IP), None)
+        if sock is not None:
+            sock.close()
+
+    def stats(self):
+        """
+        Returns the packet, byte and error counters.
+        """
+        return {
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "refused": self.refused,
+            "sockets_open": len(self._sockets),
+            "sockets_opened": self.sockets_opened,
+        }
+
+    def close(self):
+        """
+        Closes every cached socket.
+        """
+        for sock in self._sockets.values():
+            sock.close()
+        self._sockets.clear()
+
+# Shared sender used by send_message.
+_sender = UDPSender()
 
 def send_message(target_ip, message, port=7501):
     """Send a UDP message to the target IP on the specified port."""
-    # Create UDP socket
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    # Enable broadcast if target IP is the broadcast address
-    if target_ip == "255.255.255.255":
-        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-
-    # Convert the message to bytes and send it
-    bytes_to_send = str.encode(message)
-    client_socket.sendto(bytes_to_send, (target_ip, port))
+    _sender.send(message, target_ip, port)
     print(f"Sent message '{message}' to {target_ip}:{port}")
 
+def to_binary(message, seq=0):
+    """Converts a text message ("shooter:target" or a number) to the binary format."""
+    decoded = wire_format.decode_text(message.encode())
+    if decoded is None or not all(0 <= field <= 0xFFFF for field in (decoded.shooter, decoded.target)):
+        raise ValueError(f"Cannot encode '{message}' in the binary format (IDs must be 0-65535).")
+    return wire_format.encode(decoded.type, decoded.shooter, decoded.target, seq)
+
+# ---------------------------------------------------------
+# Load Generator
+# ---------------------------------------------------------
+# Equipment IDs of the virtual taggers: green from 1000, red after them.
+LOAD_EQUIPMENT_BASE = 1000
+GREEN_BASE_CODE = 43
+RED_BASE_CODE = 53
+
+# Gap between one tagger's shots, for a mean gap of `mean` seconds.
+DISTRIBUTIONS = {
+    "poisson": lambda rng, mean: rng.expovariate(1.0 / mean),
+    "uniform": lambda rng, mean: rng.uniform(0.0, 2.0 * mean),
+    "constant": lambda rng, mean: mean,
+}
+
+# Malformed datagrams the generator mixes in.
+MALFORMED = (b"", b"garbage", b"12:", b":34", b"\x81\x01\x00", b"\xff" * 10)
+
+def burst_size(rng, mean):
+    """
+    Number of messages in one burst: geometric with the given mean (1
+    means no bursts).
+    """
+    if mean <= 1:
+        return 1
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - 1.0 / mean))
+
+def tagger_roster(taggers_per_team):
+    """
+    Returns [(equipment ID, team)] for every virtual tagger.
+    """
+    return [(LOAD_EQUIPMENT_BASE + i, "green" if i < taggers_per_team else "red")
+            for i in range(2 * taggers_per_team)]
+
+def load_worker(index, target_ip, port, taggers, opponents, settings, results, stop):
+    """
+    One load generator process. Each of its taggers fires bursts of hit
+    messages at the settings' rate (per tagger, averaged over bursts) for
+    settings["duration"] seconds, starting at wall-clock settings["start"].
+    Binary messages carry a sequence number; the send time of each is
+    kept until the server's ACK for it arrives, giving the end-to-end
+    latency. Progress goes to `results` every 0.25 s and the totals (with
+    the raw latencies) when done.
+    """
+    rng = random.Random(settings["seed"] + index)
+    gap = DISTRIBUTIONS[settings["distribution"]]
+    mean_gap = settings["burst"] / settings["rate"]
+    binary = settings["binary"]
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.connect((target_ip, port))
+    sock.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    ack_buffer = bytearray(64)
+    decode_binary = wire_format.decode_binary
+    perf_counter = time.perf_counter
+
+    pending = {}                   # seq -> perf_counter() at send
+    latencies = array("d")
+    counts = {"sent": 0, "malformed": 0, "bases": 0, "acked": 0, "send_errors": 0, "behind_ms": 0.0}
+    reported = {"sent": 0, "acked": 0}
+
+    def drain_acks():
+        while True:
+            try:
+                nbytes = sock.recv_into(ack_buffer)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            message = decode_binary(memoryview(ack_buffer)[:nbytes])
+            if message is not None and message.type == wire_format.ACK:
+                sent_at = pending.pop(message.seq, None)
+                if sent_at is not None:
+                    latencies.append(perf_counter() - sent_at)
+                    counts["acked"] += 1
+
+    def report():
+        results.put(("progress", index, counts["sent"] - reported["sent"], counts["acked"] - reported["acked"]))
+        reported["sent"], reported["acked"] = counts["sent"], counts["acked"]
+
+    # Both clocks, so every process starts at the same wall-clock moment.
+    begin = perf_counter() + max(settings["start"] - time.time(), 0.0)
+    end = begin + settings["duration"]
+    heap = [(begin + rng.uniform(0.0, mean_gap), i) for i in range(len(taggers))]
+    heapq.heapify(heap)
+    seq = 0
+    next_report = begin + 0.25
+    next_drain = 32
+    try:
+        while not stop.is_set():
+            now = perf_counter()
+            if now >= next_report:
+                report()
+                next_report = now + 0.25
+            due, i = heap[0]
+            if due >= end:
+                break
+            if due > now:
+                if selector.select(min(due, next_report) - now):
+                    drain_acks()
+                continue
+            heapq.heapreplace(heap, (due + gap(rng, mean_gap), i))
+            counts["behind_ms"] = max(counts["behind_ms"], (now - due) * 1000)
+            shooter, team = taggers[i]
+            for _ in range(burst_size(rng, settings["burst"])):
+                roll = rng.random()
+                kind = "hits"
+                sequenced = False    # whether this message waits in `pending` for an ACK
+                if roll < settings["malformed"]:
+                    payload = rng.choice(MALFORMED)
+                    kind = "malformed"
+                else:
+                    seq += 1
+                    if roll < settings["malformed"] + settings["base"]:
+                        target = RED_BASE_CODE if team == "green" else GREEN_BASE_CODE
+                        kind = "bases"
+                    else:
+                        target = rng.choice(opponents[team])
+                    if binary:
+                        payload = wire_format.encode_hit(shooter, target, seq)
+                        pending[seq] = perf_counter()
+                        sequenced = True
+                    else:
+                        payload = f"{shooter}:{target}".encode()
+                try:
+                    sock.send(payload)
+                except (BlockingIOError, ConnectionRefusedError):
+                    counts["send_errors"] += 1
+                    if sequenced:
+                        del pending[seq]
+                    continue
+                counts["sent"] += 1
+                if kind != "hits":
+                    counts[kind] += 1
+            if counts["sent"] >= next_drain:
+                drain_acks()
+                next_drain = counts["sent"] + 32
+
+        counts["seconds"] = perf_counter() - begin
+        # Give the server a moment to acknowledge the last messages.
+        settle = perf_counter() + settings["settle"]
+        while pending and perf_counter() < settle:
+            if selector.select(settle - perf_counter()):
+                drain_acks()
+        report()
+        counts["lost"] = len(pending)
+        results.put(("done", index, counts, latencies.tobytes()))
+    finally:
+        selector.close()
+        sock.close()
+
+def percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+def run_load(target_ip, port=7501, taggers_per_team=15, rate=5.0, distribution="poisson", burst=1.0,
+             base=0.02, malformed=0.01, duration=10.0, processes=1, binary=True, seed=None):
+    """
+    Simulates taggers_per_team virtual taggers on each team firing at
+    target_ip:port from `processes` processes, printing the send and
+    acknowledged rates every second. `rate` is each tagger's average
+    messages per second, `burst` the mean messages per burst, `base` and
+    `malformed` the fractions of base hits and malformed datagrams.
+    With binary messages and a server run with --ack, returns (and
+    prints) the server's receive rate and the end-to-end latency; lost
+    counts messages never acknowledged.
+    """
+    roster = tagger_roster(taggers_per_team)
+    opponents = {team: [eq for eq, t in roster if t != team] for team in ("green", "red")}
+    settings = {
+        "rate": rate, "distribution": distribution, "burst": burst, "base": base,
+        "malformed": malformed, "duration": duration, "binary": binary, "settle": 1.0,
+        "seed": seed if seed is not None else random.randrange(1 << 30),
+        "start": time.time() + 0.5,
+    }
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    workers = [
+        multiprocessing.Process(target=load_worker, daemon=True,
+                                args=(i, target_ip, port, roster[i::processes], opponents, settings, results, stop))
+        for i in range(processes)
+    ]
+    local = target_ip == "localhost" or target_ip.startswith("127.")
+    drops_before = port_drops(port) if local else None
+    for worker in workers:
+        worker.start()
+    print(f"{len(roster)} virtual taggers ({taggers_per_team} per team) in {processes} process(es) firing at "
+          f"{target_ip}:{port}, {rate:g} msg/s each ({distribution}, mean burst {burst:g}) for {duration:g} s")
+
+    totals = {}
+    latencies = array("d")
+    done = 0
+    interval = {"sent": 0, "acked": 0}
+    last_report = time.monotonic()
+    try:
+        while done < processes:
+            try:
+                message = results.get(timeout=0.25)
+            except queue.Empty:
+                message = None
+            if message is not None and message[0] == "progress":
+                interval["sent"] += message[2]
+                interval["acked"] += message[3]
+            elif message is not None:
+                done += 1
+                for key, value in message[2].items():
+                    totals[key] = max(totals.get(key, 0), value) if key in ("behind_ms", "seconds") \
+                        else totals.get(key, 0) + value
+                latencies.frombytes(message[3])
+            now = time.monotonic()
+            if now - last_report >= 1.0:
+                print(f"sent {interval['sent'] / (now - last_report):,.0f} msg/s, "
+                      f"acknowledged {interval['acked'] / (now - last_report):,.0f} msg/s")
+                interval = {"sent": 0, "acked": 0}
+                last_report = now
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+    drops_after = port_drops(port) if local else None
+
+    ordered = sorted(latencies)
+    seconds = totals.get("seconds", duration)
+    wellformed = totals.get("sent", 0) - totals.get("malformed", 0)
+    stats = {
+        "sent": totals.get("sent", 0),
+        "malformed": totals.get("malformed", 0),
+        "base_hits": totals.get("bases", 0),
+        "send_errors": totals.get("send_errors", 0),
+        "send_rate": totals.get("sent", 0) / seconds if seconds else 0.0,
+        "acked": totals.get("acked", 0),
+        "lost": totals.get("lost", 0) if binary else None,
+        "receive_rate": totals.get("acked", 0) / seconds if binary and seconds else None,
+        "latency_ms": {name: percentile(ordered, fraction) * 1000
+                       for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+        "max_behind_ms": totals.get("behind_ms", 0.0),
+        "kernel_drops": (drops_after - drops_before
+                         if drops_before is not None and drops_after is not None else None),
+    }
+    print(f"Sent {stats['sent']:,} messages ({stats['malformed']:,} malformed, {stats['base_hits']:,} base hits) "
+          f"in {seconds:.2f} s: {stats['send_rate']:,.0f} msg/s, send errors {stats['send_errors']:,}, "
+          f"generator fell behind by up to {stats['max_behind_ms']:.1f} ms")
+    if binary:
+        latency = stats["latency_ms"]
+        print(f"Acknowledged {stats['acked']:,} of {wellformed:,} ({stats['receive_rate']:,.0f} msg/s), "
+              f"lost {stats['lost']:,}, receiver kernel drops "
+              f"{'n/a' if stats['kernel_drops'] is None else format(stats['kernel_drops'], ',')}")
+        if ordered:
+            print(f"End-to-end latency: p50 {latency['p50']:.3f} ms, p95 {latency['p95']:.3f} ms, "
+                  f"p99 {latency['p99']:.3f} ms, max {latency['max']:.3f} ms")
+        else:
+            print("No ACKs received: start the server with --ack to measure latency.")
+    return stats
+
+def load_main(argv):
+    usage = ("Usage: python udp_client.py load <target_ip> [port] [--taggers N] [--rate msg/s] "
+             "[--dist poisson|uniform|constant] [--burst N] [--base fraction] [--malformed fraction] "
+             "[--duration s] [--processes N] [--seed N] [--text]")
+    options = {"--taggers": "15", "--rate": "5", "--dist": "poisson", "--burst": "1", "--base": "0.02",
+               "--malformed": "0.01", "--duration": "10", "--processes": "1", "--seed": None}
+    binary = "--text" not in argv
+    argv = [arg for arg in argv if arg != "--text"]
+    args = []
+    i = 0
+    while i < len(argv):
+        if argv[i] in options and i + 1 < len(argv):
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            args.append(argv[i])
+            i += 1
+    try:
+        if not 1 <= len(args) <= 2 or options["--dist"] not in DISTRIBUTIONS:
+            raise ValueError(usage)
+        port = int(args[1]) if len(args) > 1 else 7501
+        taggers, processes = int(options["--taggers"]), int(options["--processes"])
+        rate, burst, base, malformed, duration = (float(options[name]) for name in
+                                                  ("--rate", "--burst", "--base", "--malformed", "--duration"))
+        seed = int(options["--seed"]) if options["--seed"] is not None else None
+        if taggers < 1 or processes < 1 or rate <= 0 or burst < 1 or duration <= 0:
+            raise ValueError("Taggers, processes, rate, burst and duration must be positive.")
+        if base + malformed > 1:
+            raise ValueError("Base and malformed fractions add up to more than 1.")
+        if LOAD_EQUIPMENT_BASE + 2 * taggers > 0xFFFF:
+            raise ValueError("Too many taggers for 16-bit equipment IDs.")
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    run_load(args[0], port, taggers, rate, options["--dist"], burst, base, malformed, duration,
+             min(processes, 2 * taggers), binary, seed)
+
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python udp_client.py <target_ip> <message>")
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        load_main(sys.argv[2:])
+        return
+    # --binary sends the message in the compact binary wire format.
+    binary = "--binary" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--binary"]
+    if len(args) < 2:
+        print("Usage: python udp_client.py <target_ip> <message> [--binary] | python udp_client.py load ...")
         sys.exit(1)
 
-    target_ip = sys.argv[1]
-    message = sys.argv[2]
-    send_message(target_ip, message)
+    target_ip = args[0]
+    message = args[1]
+    if binary:
+        try:
+            _sender.send(to_binary(message), target_ip)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        print(f"Sent binary message '{message}' to {target_ip}:7501")
+    else:
+        send_message(target_ip, message)
+    _sender.close()
 
 if __name__ == "__main__":
     main()
@@ -1,30 +1,243 @@
-import sys
+import os
+import selectors
 import socket
+import sys
+import time
+
+import wire_format
+from event_log import EventLog, IN
+
+class UDPReceiver:
+    """
+    High-throughput UDP receive loop. The socket is non-blocking with a
+    large kernel receive buffer; each wakeup drains up to batch_size
+    datagrams into one preallocated buffer with recvfrom_into, so the hot
+    path does no per-packet allocation or decoding. Every datagram is
+    passed to handler(data, addr), where data is a memoryview that is
+    only valid during the call (copy it with bytes(data) to keep it).
+    With a `log` (an event_log.EventLog), every datagram is also
+    appended to it before the handler runs.
+    """
+    def __init__(self, local_ip, local_port, handler=None, rcvbuf=4 * 1024 * 1024,
+                 buffer_size=2048, batch_size=256, reuse_port=False, log=None):
+        self.handler = handler if handler is not None else print_message
+        self.log = log
+        self.batch_size = batch_size
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if reuse_port:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.sock.bind((local_ip, local_port))
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+        # The kernel may clamp (or on Linux, double) the requested size.
+        self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self._running = False
+
+        # Counters exposed through stats().
+        self.packets = 0
+        self.bytes = 0
+        self.batches = 0
+        self.full_batches = 0    # Drains that hit batch_size (we are falling behind).
+        self.truncated = 0       # Datagrams that filled the whole receive buffer.
+        self.handler_errors = 0
+
+    def poll(self, timeout=None):
+        """
+        Waits up to `timeout` seconds for traffic, then drains up to
+        batch_size datagrams. Returns the number of datagrams handled.
+        """
+        if not self._selector.select(timeout):
+            return 0
+        recv_into = self.sock.recvfrom_into
+        view = self._view
+        buffer_size = len(view)
+        handler = self.handler
+        log = self.log
+        count = 0
+        nbytes_total = 0
+        while count < self.batch_size:
+            try:
+                nbytes, addr = recv_into(view)
+            except BlockingIOError:
+                break
+            count += 1
+            nbytes_total += nbytes
+            if nbytes == buffer_size:
+                self.truncated += 1
+            if log is not None:
+                log.append(IN, view[:nbytes], addr)
+            try:
+                handler(view[:nbytes], addr)
+            except Exception as e:
+                self.handler_errors += 1
+                if self.handler_errors == 1:
+                    print("UDP handler error:", e)
+        self.packets += count
+        self.bytes += nbytes_total
+        self.batches += 1
+        if count == self.batch_size:
+            self.full_batches += 1
+        return count
+
+    def serve_forever(self, poll_timeout=0.5, on_idle=None):
+        """
+        Runs poll() until stop() is called. on_idle, if given, is called
+        after every poll (e.g. for periodic stats).
+        """
+        self._running = True
+        while self._running:
+            self.poll(poll_timeout)
+            if on_idle is not None:
+                on_idle()
+
+    def stop(self):
+        """
+        Makes serve_forever return after the current poll.
+        """
+        self._running = False
+
+    def kernel_drops(self):
+        """
+        Returns how many datagrams the kernel dropped for this socket
+        because its receive buffer was full (Linux only, else None).
+        """
+        try:
+            inode = str(os.fstat(self.sock.fileno()).st_ino)
+            with open("/proc/net/udp") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 12 and fields[9] == inode:
+                        return int(fields[12])
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def stats(self):
+        """
+        Returns the receive counters, including kernel drops where available.
+        """
+        return {
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "full_batches": self.full_batches,
+            "truncated": self.truncated,
+            "handler_errors": self.handler_errors,
+            "kernel_drops": self.kernel_drops(),
+            "rcvbuf": self.rcvbuf,
+        }
+
+    def close(self):
+        self._selector.close()
+        self.sock.close()
+
+def port_drops(port):
+    """
+    Returns the total kernel drop count of every UDP socket bound to
+    `port` on this machine (Linux only, else None). Covers several
+    SO_REUSEPORT receivers on the same port.
+    """
+    total = None
+    try:
+        with open("/proc/net/udp") as f:
+            next(f)
+            for line in f:
+                fields = line.split()
+                if len(fields) > 12 and int(fields[1].split(":")[1], 16) == port:
+                    total = (total or 0) + int(fields[12])
+    except (OSError, ValueError, StopIteration):
+        return None
+    return total
+
+def with_acks(receiver, handler):
+    """
+    Wraps a handler so that, after it has run, every binary message is
+    acknowledged with an ACK record carrying its sequence number, sent
+    back to the sender. Load generators use the ACKs to measure
+    end-to-end latency. Text messages carry no sequence number and are
+    not acknowledged.
+    """
+    sendto = receiver.sock.sendto
+    decode_binary = wire_format.decode_binary
+    encode_ack = wire_format.encode_ack
+    ACK = wire_format.ACK
+
+    def handle(data, addr):
+        handler(data, addr)
+        message = decode_binary(data)
+        if message is not None and message.type != ACK:
+            try:
+                sendto(encode_ack(message.seq), addr)
+            except OSError:
+                # Socket buffer full: the sender counts the message as lost.
+                pass
+    return handle
+
+def print_message(data, addr):
+    """Default handler: decode and print every message."""
+    if wire_format.is_binary(data):
+        print(f"Received binary message {wire_format.decode_binary(data)} from {addr}")
+        return
+    message = bytes(data).decode("utf-8", errors="replace")
+    print(f"Received message '{message}' from {addr}")
+
+def count_only(data, addr):
+    """Handler for --quiet mode: do nothing, the receiver counts packets."""
 
 def main():
+    # --quiet replaces per-message printing with a once-a-second rate line.
+    # --log records every datagram to an event log in game_logs/.
+    # --ack acknowledges every binary message (see udp_client.py load).
+    quiet = "--quiet" in sys.argv
+    ack = "--ack" in sys.argv
+    log = EventLog() if "--log" in sys.argv else None
+    args = [arg for arg in sys.argv[1:] if arg not in ("--quiet", "--log", "--ack")]
+
     # Default values: listen on all interfaces, port 7501
     local_ip = "0.0.0.0"
     local_port = 7501
 
-    if len(sys.argv) > 1:
-        local_ip = sys.argv[1]
-    if len(sys.argv) > 2:
+    if len(args) > 0:
+        local_ip = args[0]
+    if len(args) > 1:
         try:
-            local_port = int(sys.argv[2])
+            local_port = int(args[1])
         except ValueError:
             print("Port must be an integer.")
             sys.exit(1)
 
-    buffer_size = 1024
-    # Create and bind the UDP server socket
-    UDPServerSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    UDPServerSocket.bind((local_ip, local_port))
-    print(f"UDP server listening on {local_ip}:{local_port}")
+    # Create and bind the UDP receiver
+    receiver = UDPReceiver(local_ip, local_port, handler=count_only if quiet else print_message, log=log)
+    if ack:
+        receiver.handler = with_acks(receiver, receiver.handler)
+    print(f"UDP server listening on {local_ip}:{local_port} (receive buffer {receiver.rcvbuf} bytes)")
+    if log is not None:
+        print("Logging to", log.rotate("server"))
+
+    last = {"time": time.monotonic(), "packets": 0}
+    def report():
+        now = time.monotonic()
+        if now - last["time"] >= 1.0:
+            rate = (receiver.packets - last["packets"]) / (now - last["time"])
+            stats = receiver.stats()
+            print(f"{rate:,.0f} msg/s, total {stats['packets']:,}, "
+                  f"kernel drops {stats['kernel_drops']}, truncated {stats['truncated']}")
+            last["time"], last["packets"] = now, receiver.packets
 
-    while True:
-        data, addr = UDPServerSocket.recvfrom(buffer_size)
-        message = data.decode("utf-8")
-        print(f"Received message '{message}' from {addr}")
+    try:
+        receiver.serve_forever(on_idle=report if quiet else None)
+    except KeyboardInterrupt:
+        print("Receiver stats:", receiver.stats())
+    finally:
+        receiver.close()
+        if log is not None:
+            log.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from collections import Counter
+
+from udp_server import UDPReceiver
+from wire_format import parse_hit
+
+# ---------------------------------------------------------
+# Worker Processes
+# ---------------------------------------------------------
+def worker(index, local_ip, local_port, results, stop, flush_interval):
+    """
+    One receive shard. Binds local_port with SO_REUSEPORT (the kernel
+    spreads senders across every worker bound to the port), parses its
+    share of the hit messages and every flush_interval seconds sends the
+    counts it gathered since the last flush to the launcher.
+    """
+    hits = Counter()         # (shooter, target) -> count
+    malformed = [0]
+
+    def handle(data, addr):
+        hit = parse_hit(data)
+        if hit is None:
+            malformed[0] += 1
+        else:
+            hits[hit] += 1
+
+    receiver = UDPReceiver(local_ip, local_port, handler=handle, reuse_port=True)
+    last_flush = time.monotonic()
+    last_packets = 0
+    try:
+        while not stop.is_set():
+            receiver.poll(flush_interval)
+            now = time.monotonic()
+            if now - last_flush >= flush_interval:
+                results.put((index, dict(hits), malformed[0], receiver.packets - last_packets,
+                             receiver.kernel_drops()))
+                hits.clear()
+                malformed[0] = 0
+                last_packets = receiver.packets
+                last_flush = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+
+# ---------------------------------------------------------
+# Merged Scoreboard
+# ---------------------------------------------------------
+class ShardedScoreboard:
+    """
+    Merges the per-worker deltas into one view: how many tags each
+    equipment ID landed and received, plus packet and drop totals.
+    """
+    def __init__(self, workers):
+        self.tags_landed = Counter()
+        self.tags_received = Counter()
+        self.packets = 0
+        self.malformed = 0
+        self.packets_per_worker = [0] * workers
+        self.kernel_drops = [0] * workers
+
+    def merge(self, index, hits, malformed, packets, kernel_drops):
+        for (shooter, target), count in hits.items():
+            self.tags_landed[shooter] += count
+            self.tags_received[target] += count
+        self.malformed += malformed
+        self.packets += packets
+        self.packets_per_worker[index] += packets
+        if kernel_drops is not None:
+            self.kernel_drops[index] = kernel_drops
+
+    def top(self, n=5):
+        return self.tags_landed.most_common(n)
+
+# ---------------------------------------------------------
+# Launcher
+# ---------------------------------------------------------
+def run(local_ip="0.0.0.0", local_port=7501, workers=None, flush_interval=0.25, report_interval=1.0):
+    """
+    Starts the worker processes and prints the merged scoreboard every
+    report_interval seconds until interrupted.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=worker, args=(i, local_ip, local_port, results, stop, flush_interval),
+                                daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"{workers} UDP workers listening on {local_ip}:{local_port} with SO_REUSEPORT")
+
+    scoreboard = ShardedScoreboard(workers)
+    last_report = time.monotonic()
+    last_packets = 0
+    try:
+        while True:
+            try:
+                scoreboard.merge(*results.get(timeout=report_interval))
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if now - last_report >= report_interval:
+                rate = (scoreboard.packets - last_packets) / (now - last_report)
+                print(f"{rate:,.0f} msg/s, total {scoreboard.packets:,}, malformed {scoreboard.malformed}, "
+                      f"per worker {scoreboard.packets_per_worker}, kernel drops {sum(scoreboard.kernel_drops)}")
+                print("  top taggers:", ", ".join(f"{eq}={count}" for eq, count in scoreboard.top()))
+                last_report, last_packets = now, scoreboard.packets
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=2)
+    return scoreboard
+
+def main():
+    local_ip = "0.0.0.0"
+    local_port = 7501
+    workers = None
+    try:
+        if len(sys.argv) > 1:
+            local_ip = sys.argv[1]
+        if len(sys.argv) > 2:
+            local_port = int(sys.argv[2])
+        if len(sys.argv) > 3:
+            workers = int(sys.argv[3])
+    except ValueError:
+        print("Usage: python udp_sharded.py [ip] [port] [workers]")
+        sys.exit(1)
+    run(local_ip, local_port, workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import struct
+from collections import namedtuple
+
+# ---------------------------------------------------------
+# Wire Formats
+# ---------------------------------------------------------
+# Two formats share the same ports:
+#   text   - the original ASCII messages: "shooter:target" for hits and a
+#            bare number for equipment IDs and control codes.
+#   binary - a fixed 10-byte record (network byte order):
+#              u8  version  (high bit set, so it never looks like ASCII)
+#              u8  message type
+#              u16 equipment ID of the shooter (or the equipment/control code)
+#              u16 equipment ID of the target (0 if unused)
+#              u32 sequence number
+# Receivers tell them apart by the first byte, so senders can switch
+# formats without any handshake.
+BINARY_VERSION = 0x81
+BINARY_FLAG = 0x80
+BINARY_RECORD = struct.Struct("!BBHHI")
+BINARY_SIZE = BINARY_RECORD.size
+
+# Message types.
+HIT = 1          # shooter tagged target (target 43/53 is a base)
+EQUIPMENT = 2    # equipment ID announcement
+CONTROL = 3      # game control code, e.g. 202 start, 221 end
+ACK = 4          # receiver acknowledgement of `seq`
+
+# Decoded message. seq is None for text messages.
+Message = namedtuple("Message", ["type", "shooter", "target", "seq"])
+
+def is_binary(data):
+    """Returns True if the datagram uses the binary format."""
+    return len(data) > 0 and data[0] & BINARY_FLAG != 0
+
+# ---------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------
+def encode(msg_type, shooter, target=0, seq=0):
+    """Packs one binary record and returns it as bytes."""
+    return BINARY_RECORD.pack(BINARY_VERSION, msg_type, shooter, target, seq & 0xFFFFFFFF)
+
+def encode_into(buffer, offset, msg_type, shooter, target=0, seq=0):
+    """Packs one binary record into a preallocated buffer; returns the next offset."""
+    BINARY_RECORD.pack_into(buffer, offset, BINARY_VERSION, msg_type, shooter, target, seq & 0xFFFFFFFF)
+    return offset + BINARY_SIZE
+
+def encode_hit(shooter, target, seq=0):
+    return encode(HIT, shooter, target, seq)
+
+def encode_equipment(equipment_id, seq=0):
+    return encode(EQUIPMENT, equipment_id, 0, seq)
+
+def encode_control(code, seq=0):
+    return encode(CONTROL, code, 0, seq)
+
+def encode_ack(seq):
+    return encode(ACK, 0, 0, seq)
+
+def encode_text(message):
+    """Encodes a message in the original text format."""
+    if message.type == HIT:
+        return f"{message.shooter}:{message.target}".encode()
+    return str(message.shooter).encode()
+
+# ---------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------
+def decode_binary(data):
+    """
+    Unpacks a binary record straight from bytes or a memoryview (no copy).
+    Returns a Message, or None if the record is short or an unknown version.
+    """
+    if len(data) < BINARY_SIZE or data[0] != BINARY_VERSION:
+        return None
+    _, msg_type, shooter, target, seq = BINARY_RECORD.unpack_from(data)
+    return Message(msg_type, shooter, target, seq)
+
+def decode_text(data):
+    """
+    Parses a text message: "shooter:target" is a HIT, a bare number is an
+    EQUIPMENT ID (or CONTROL code, which the receiver cannot distinguish).
+    Returns a Message, or None if malformed.
+    """
+    shooter, sep, target = bytes(data).partition(b":")
+    try:
+        if sep:
+            return Message(HIT, int(shooter), int(target), None)
+        return Message(EQUIPMENT, int(shooter), 0, None)
+    except ValueError:
+        return None
+
+def decode(data):
+    """Decodes a datagram in either format. Returns a Message or None."""
+    if is_binary(data):
+        return decode_binary(data)
+    return decode_text(data)
+
+def parse_hit(data):
+    """
+    Fast path for the receive loop: returns (shooter, target) for a hit
+    in either format, or None for anything else.
+    """
+    if len(data) > 0 and data[0] & BINARY_FLAG:
+        if len(data) < BINARY_SIZE or data[0] != BINARY_VERSION:
+            return None
+        _, msg_type, shooter, target, _ = BINARY_RECORD.unpack_from(data)
+        return (shooter, target) if msg_type == HIT else None
+    shooter, sep, target = bytes(data).partition(b":")
+    if not sep:
+        return None
+    try:
+        return int(shooter), int(target)
+    except ValueError:
+        return None